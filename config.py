@@ -1,11 +1,16 @@
 """
 SageMaker Coding Agent - Configuration
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Optional, Set
 import json
 import os
 
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
+
 
 @dataclass
 class AgentConfig:
@@ -47,9 +52,11 @@ class AgentConfig:
     def load(cls, path: str = "./agent_config.json") -> "AgentConfig":
         """Load config from JSON file."""
         if os.path.exists(path):
-            with open(path, "r") as f:
-                data = json.load(f)
-            return cls(**data)
+            with open(path, "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            # Ignore unknown keys (e.g. from newer versions)
+            return cls(**{k: v for k, v in data.items() if k in _ALLOWED_FIELDS})
         return cls()
 
     def save(self, path: str = "./agent_config.json"):
@@ -70,9 +77,17 @@ class AgentConfig:
             "default_timeout": self.default_timeout,
             "allow_network": self.allow_network,
         }
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
 
     def get_workspace_abs(self) -> str:
         """Get absolute path to workspace root."""
         return os.path.abspath(self.workspace_root)
+
+
+# Field names accepted by AgentConfig.load()
+_ALLOWED_FIELDS = frozenset(f.name for f in fields(AgentConfig))
@@ -2,12 +2,13 @@
 Agent Loop - Main ReAct loop with doom loop detection
 
 Optimizations:
-- History trimming to prevent token explosion
+- Bounded history window to prevent token explosion
 - Tool result truncation
 """
-from typing import List, Dict, Optional, Callable, Any
+import sys
+from typing import List, Dict, Optional, Callable, Any, Hashable, Iterator, Tuple
 from dataclasses import dataclass, field
-from collections import deque
+from collections import deque, Counter
 
 # Token limits
 MAX_HISTORY_MESSAGES = 20  # Keep last N messages
@@ -16,7 +17,8 @@ MAX_TOOL_RESULT_CHARS = 5000  # Truncate tool results
 
 def estimate_tokens(text: str) -> int:
     """Rough token estimate (4 chars per token)."""
-    return len(str(text)) // 4
+    # Skip the str() copy for the common case
+    return (len(text) if isinstance(text, str) else len(str(text))) >> 2
 
 
 def truncate_tool_result(result: str, max_chars: int = MAX_TOOL_RESULT_CHARS) -> str:
@@ -26,6 +28,16 @@ def truncate_tool_result(result: str, max_chars: int = MAX_TOOL_RESULT_CHARS) ->
     return result[:max_chars] + f"\n\n[Truncated - {len(result)} chars total, showing first {max_chars}]"
 
 
+def _tool_use(tc) -> Dict:
+    """Build a tool_use content block for an assistant message."""
+    return {"type": "tool_use", "id": tc.id, "name": tc.name, "input": tc.input}
+
+
+def _tool_result(tool_use_id: str, content: str) -> Dict:
+    """Build a tool_result content block for a user message."""
+    return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content}
+
+
 def trim_history(messages: List[Dict], max_messages: int = MAX_HISTORY_MESSAGES) -> List[Dict]:
     """
     Trim message history to prevent context explosion.
@@ -47,12 +59,44 @@ def trim_history(messages: List[Dict], max_messages: int = MAX_HISTORY_MESSAGES)
     return [summary] + trimmed
 
 
+class ToolHistory:
+    """Bounded history of recent tool calls with O(1) occurrence counts."""
+
+    def __init__(self, maxlen: int = 10):
+        self._dq: deque = deque(maxlen=maxlen)
+        self.counts: Counter = Counter()
+
+    def append(self, key: Hashable):
+        """Record a tool call, evicting the oldest once full."""
+        dq = self._dq
+        if len(dq) == dq.maxlen:
+            evicted = dq[0]
+            self.counts[evicted] -= 1
+            if not self.counts[evicted]:
+                del self.counts[evicted]
+        dq.append(key)
+        self.counts[key] += 1
+
+    def clear(self):
+        """Forget all recorded tool calls."""
+        self._dq.clear()
+        self.counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._dq)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._dq)
+
+
 @dataclass
 class AgentState:
     """State of the agent during execution."""
 
-    messages: List[Dict] = field(default_factory=list)
-    tool_history: deque = field(default_factory=lambda: deque(maxlen=10))
+    # Bounded window - oldest messages are evicted on append
+    messages: deque = field(default_factory=lambda: deque(maxlen=MAX_HISTORY_MESSAGES))
+    trimmed_count: int = 0
+    tool_history: ToolHistory = field(default_factory=ToolHistory)
     turn_count: int = 0
     total_input_tokens: int = 0
     total_output_tokens: int = 0
@@ -97,12 +141,17 @@ class AgentLoop:
         self.context = context
         self.max_turns = max_turns
         self.doom_threshold = doom_threshold
-        self.on_text = on_text or print
+        # Default to buffered stdout writes, flushed once per turn
+        self.on_text = on_text or sys.stdout.write
+        self._end_turn = self._stdout_end_turn if on_text is None else None
         self.on_tool_call = on_tool_call
         self.on_tool_result = on_tool_result
         self.on_approval = on_approval
         self.on_context_warning = on_context_warning
         self.state = AgentState()
+        self._trim_marker: Optional[Tuple[int, Dict]] = None
+        self._tool_defs_cache: Optional[List[Dict]] = None
+        self._tool_defs_version: Optional[int] = None
 
     def run(self, user_message: str) -> str:
         """
@@ -114,213 +163,204 @@ class AgentLoop:
         Returns:
             Final response text
         """
-        # Add user message
-        self.state.messages.append({"role": "user", "content": user_message})
-
-        final_response = ""
-
-        while self.state.turn_count < self.max_turns:
-            self.state.turn_count += 1
+        return self._run(user_message, streaming=False)
 
-            # Call LLM
-            try:
-                response = self.client.chat(
-                    messages=self.state.messages,
-                    system=self.system_prompt,
-                    tools=self.registry.get_tool_definitions(),
-                )
-            except Exception as e:
-                error_msg = f"Error calling LLM: {e}"
-                self.on_text(error_msg)
-                return error_msg
-
-            # Output text
-            if response.text:
-                self.on_text(response.text)
-                final_response = response.text
-
-            # No tool calls = done
-            if not response.tool_calls:
-                break
-
-            # Check doom loop
-            if self._detect_doom_loop(response.tool_calls):
-                warning = "\n[Warning: Detected repetitive tool calls. Breaking loop.]"
-                self.on_text(warning)
-                break
-
-            # Build assistant message with tool calls
-            assistant_content = []
-            if response.text:
-                assistant_content.append({"type": "text", "text": response.text})
-
-            for tc in response.tool_calls:
-                assistant_content.append(
-                    {
-                        "type": "tool_use",
-                        "id": tc.id,
-                        "name": tc.name,
-                        "input": tc.input,
-                    }
-                )
-
-            self.state.messages.append({"role": "assistant", "content": assistant_content})
-
-            # Execute tools
-            tool_results = []
-            for tc in response.tool_calls:
-                # Notify about tool call
-                if self.on_tool_call:
-                    self.on_tool_call(tc.name, tc.input)
-
-                # Check if tool requires approval
-                tool = self.registry.get(tc.name)
-                if tool and tool.requires_approval and self.on_approval:
-                    approved = self.on_approval(tc.name, tc.input)
-                    if not approved:
-                        tool_results.append(
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": tc.id,
-                                "content": "User denied permission for this operation.",
-                            }
-                        )
-                        continue
-
-                # Execute tool
-                result = self.registry.execute(tc.name, tc.input, self.context)
-
-                # Notify about result
-                if self.on_tool_result:
-                    self.on_tool_result(tc.name, result)
-
-                # Truncate result to save tokens
-                truncated_result = truncate_tool_result(result)
-                tool_results.append(
-                    {"type": "tool_result", "tool_use_id": tc.id, "content": truncated_result}
-                )
-
-                # Track for doom loop detection
-                self.state.tool_history.append((tc.name, str(tc.input)))
-
-            # Add tool results as user message
-            self.state.messages.append({"role": "user", "content": tool_results})
-
-            # Trim history if getting too long
-            self.state.messages = trim_history(self.state.messages)
+    def run_streaming(self, user_message: str) -> str:
+        """
+        Run agent loop with streaming output.
 
-        if self.state.turn_count >= self.max_turns:
-            warning = f"\n[Warning: Reached maximum turns ({self.max_turns}). Stopping.]"
-            self.on_text(warning)
+        Args:
+            user_message: User's input message
 
-        return final_response
+        Returns:
+            Final response text
+        """
+        return self._run(user_message, streaming=True)
 
-    def run_streaming(self, user_message: str) -> str:
+    def _run(self, user_message: str, streaming: bool) -> str:
         """
-        Run agent loop with streaming output.
+        Shared ReAct loop for run() and run_streaming().
 
         Args:
             user_message: User's input message
+            streaming: Stream text through on_text as it arrives
 
         Returns:
             Final response text
         """
+        state = self.state
+        on_text = self.on_text
+        end_turn = self._end_turn
+
         # Add user message
-        self.state.messages.append({"role": "user", "content": user_message})
+        self._append_message({"role": "user", "content": user_message})
 
         final_response = ""
 
-        while self.state.turn_count < self.max_turns:
-            self.state.turn_count += 1
+        while state.turn_count < self.max_turns:
+            state.turn_count += 1
 
-            # Call LLM with streaming
+            # Call LLM
             try:
-                response = self.client.stream_chat(
-                    messages=self.state.messages,
-                    system=self.system_prompt,
-                    tools=self.registry.get_tool_definitions(),
-                    on_text=self.on_text,
-                )
+                if streaming:
+                    response = self.client.stream_chat(
+                        messages=self._llm_messages(),
+                        system=self.system_prompt,
+                        tools=self._tool_defs(),
+                        on_text=on_text,
+                    )
+                else:
+                    response = self.client.chat(
+                        messages=self._llm_messages(),
+                        system=self.system_prompt,
+                        tools=self._tool_defs(),
+                    )
             except Exception as e:
                 error_msg = f"Error calling LLM: {e}"
-                self.on_text(error_msg)
+                on_text(error_msg)
+                if end_turn:
+                    end_turn()
                 return error_msg
 
             if response.text:
+                # Streamed text has already been emitted chunk by chunk
+                if not streaming:
+                    on_text(response.text)
+                if end_turn:
+                    end_turn()
                 final_response = response.text
 
             # No tool calls = done
             if not response.tool_calls:
                 break
 
+            # Doom-loop keys, stringified once per turn
+            keys = [(tc.name, str(tc.input)) for tc in response.tool_calls]
+
             # Check doom loop
-            if self._detect_doom_loop(response.tool_calls):
+            if self._detect_doom_loop(keys):
                 warning = "\n[Warning: Detected repetitive tool calls. Breaking loop.]"
-                self.on_text(warning)
+                on_text(warning)
+                if end_turn:
+                    end_turn()
                 break
 
-            # Build assistant message
-            assistant_content = []
-            if response.text:
-                assistant_content.append({"type": "text", "text": response.text})
-
-            for tc in response.tool_calls:
-                assistant_content.append(
-                    {
-                        "type": "tool_use",
-                        "id": tc.id,
-                        "name": tc.name,
-                        "input": tc.input,
-                    }
-                )
-
-            self.state.messages.append({"role": "assistant", "content": assistant_content})
-
-            # Execute tools
-            tool_results = []
-            for tc in response.tool_calls:
-                if self.on_tool_call:
-                    self.on_tool_call(tc.name, tc.input)
-
-                tool = self.registry.get(tc.name)
-                if tool and tool.requires_approval and self.on_approval:
-                    approved = self.on_approval(tc.name, tc.input)
-                    if not approved:
-                        tool_results.append(
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": tc.id,
-                                "content": "User denied permission for this operation.",
-                            }
-                        )
-                        continue
-
-                result = self.registry.execute(tc.name, tc.input, self.context)
-
-                if self.on_tool_result:
-                    self.on_tool_result(tc.name, result)
-
-                # Truncate result to save tokens
-                truncated_result = truncate_tool_result(result)
-                tool_results.append(
-                    {"type": "tool_result", "tool_use_id": tc.id, "content": truncated_result}
-                )
-
-                self.state.tool_history.append((tc.name, str(tc.input)))
-
-            self.state.messages.append({"role": "user", "content": tool_results})
-
-            # Trim history if getting too long
-            self.state.messages = trim_history(self.state.messages)
+            self._append_assistant(response)
+
+            # Add tool results as user message
+            tool_results = self._execute_tools(response.tool_calls, keys)
+            self._append_message({"role": "user", "content": tool_results})
+
+        if state.turn_count >= self.max_turns:
+            warning = f"\n[Warning: Reached maximum turns ({self.max_turns}). Stopping.]"
+            on_text(warning)
+            if end_turn:
+                end_turn()
 
         return final_response
 
-    def _detect_doom_loop(self, tool_calls: List) -> bool:
+    @staticmethod
+    def _stdout_end_turn():
+        """Terminate and flush a turn's output on the default stdout writer."""
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+    def _append_assistant(self, response):
+        """Append assistant message with text and tool calls to history."""
+        assistant_content = [_tool_use(tc) for tc in response.tool_calls]
+        if response.text:
+            assistant_content.insert(0, {"type": "text", "text": response.text})
+
+        self._append_message({"role": "assistant", "content": assistant_content})
+
+    def _tool_defs(self) -> List[Dict]:
+        """Get tool definitions, rebuilt only when the registry changes."""
+        version = getattr(self.registry, "version", None)
+        if self._tool_defs_cache is None or version != self._tool_defs_version:
+            self._tool_defs_cache = self.registry.get_tool_definitions()
+            self._tool_defs_version = version
+        return self._tool_defs_cache
+
+    def invalidate_tool_defs(self):
+        """Drop cached tool definitions (e.g. after mutating registry.tools directly)."""
+        self._tool_defs_cache = None
+
+    def _append_message(self, message: Dict):
+        """Append to bounded history, counting messages that get evicted."""
+        messages = self.state.messages
+        if len(messages) == messages.maxlen:
+            self.state.trimmed_count += 1
+        messages.append(message)
+
+    def _llm_messages(self) -> List[Dict]:
+        """Build message list for the LLM, with a marker if history was trimmed."""
+        trimmed = self.state.trimmed_count
+        if not trimmed:
+            return list(self.state.messages)
+
+        # Rebuild marker only when the trimmed count changes
+        if self._trim_marker is None or self._trim_marker[0] != trimmed:
+            summary = {
+                "role": "user",
+                "content": f"[Previous {trimmed} messages trimmed to save context]",
+            }
+            self._trim_marker = (trimmed, summary)
+        return [self._trim_marker[1], *self.state.messages]
+
+    def _execute_tools(self, tool_calls: List, keys: List[Tuple[str, str]]) -> List[Dict]:
         """
-        Detect if same tool called with same args multiple times.
+        Execute tool calls, asking for approval where required.
 
         Args:
             tool_calls: List of tool calls from current response
+            keys: Doom-loop history key for each tool call
+
+        Returns:
+            List of tool_result content blocks
+        """
+        registry = self.registry
+        context = self.context
+        on_tool_call = self.on_tool_call
+        on_tool_result = self.on_tool_result
+        on_approval = self.on_approval
+        record = self.state.tool_history.append
+
+        tool_results = []
+        for tc, key in zip(tool_calls, keys):
+            # Notify about tool call
+            if on_tool_call:
+                on_tool_call(tc.name, tc.input)
+
+            # Check if tool requires approval
+            tool = registry.get(tc.name)
+            if tool and tool.requires_approval and on_approval:
+                if not on_approval(tc.name, tc.input):
+                    tool_results.append(
+                        _tool_result(tc.id, "User denied permission for this operation.")
+                    )
+                    continue
+
+            # Execute tool
+            result = registry.execute(tc.name, tc.input, context)
+
+            # Notify about result
+            if on_tool_result:
+                on_tool_result(tc.name, result)
+
+            # Truncate result to save tokens
+            tool_results.append(_tool_result(tc.id, truncate_tool_result(result)))
+
+            # Track for doom loop detection
+            record(key)
+
+        return tool_results
+
+    def _detect_doom_loop(self, keys: List[Tuple[str, str]]) -> bool:
+        """
+        Detect if same tool called with same args multiple times.
+
+        Args:
+            keys: (tool name, stringified input) for each call in current response
 
         Returns:
             True if doom loop detected
@@ -328,21 +368,17 @@ class AgentLoop:
         if len(self.state.tool_history) < self.doom_threshold:
             return False
 
-        for tc in tool_calls:
-            key = (tc.name, str(tc.input))
-            count = sum(1 for h in self.state.tool_history if h == key)
-            if count >= self.doom_threshold:
-                return True
-
-        return False
+        counts = self.state.tool_history.counts
+        return any(counts[key] >= self.doom_threshold for key in keys)
 
     def reset(self):
         """Reset agent state for new conversation."""
         self.state = AgentState()
+        self._trim_marker = None
 
     def get_messages(self) -> List[Dict]:
         """Get current conversation messages."""
-        return self.state.messages.copy()
+        return self._llm_messages()
 
     def get_turn_count(self) -> int:
         """Get current turn count."""
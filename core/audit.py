@@ -8,10 +8,53 @@ Provides immutable audit trail for all agent actions with:
 """
 import json
 import os
+import re
 import hashlib
-from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, asdict
+from collections import Counter
+from typing import Dict, Any, Optional, List, Tuple, BinaryIO, ClassVar, Iterator
+from dataclasses import dataclass
+
+from .timeutil import now_iso
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
+
+
+def _dumps_line(obj: Dict) -> bytes:
+    """Serialize an entry as a single JSONL line (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _entry_content(
+    timestamp: str, session_id: str, action: str, tool_name: Optional[str], result_summary: str
+) -> bytes:
+    """Build the canonical bytes that an entry hash covers."""
+    return "|".join((timestamp, session_id, action, str(tool_name), result_summary)).encode()
+
+
+def _blake2b_digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _sha256_digest(content: bytes) -> bytes:
+    # Legacy scheme: first 128 bits of SHA-256
+    return hashlib.sha256(content).digest()[:16]
+
+
+# Entry hash algorithms by name (entries without "algo" are legacy sha256)
+_DIGESTS = {"blake2b": _blake2b_digest, "sha256": _sha256_digest}
+
+
+def _entry_hash(content: bytes, algo: str = "blake2b") -> str:
+    """Hash canonical entry content, returning 32 hex chars."""
+    return _DIGESTS[algo](content).hex()
 
 
 @dataclass
@@ -26,12 +69,29 @@ class AuditEntry:
     result_summary: str
     user_approved: bool
     hash: str = ""
+    algo: str = "blake2b"
 
     def __post_init__(self):
         """Generate hash for integrity verification."""
         if not self.hash:
-            content = f"{self.timestamp}|{self.session_id}|{self.action}|{self.tool_name}|{self.result_summary}"
-            self.hash = hashlib.sha256(content.encode()).hexdigest()[:32]
+            content = _entry_content(
+                self.timestamp, self.session_id, self.action, self.tool_name, self.result_summary
+            )
+            self.hash = _entry_hash(content, self.algo)
+
+
+# Serialized field order for AuditEntry (avoids dataclasses.asdict deep copy)
+_ENTRY_FIELDS = (
+    "timestamp",
+    "session_id",
+    "action",
+    "tool_name",
+    "parameters",
+    "result_summary",
+    "user_approved",
+    "hash",
+    "algo",
+)
 
 
 class AuditLogger:
@@ -51,13 +111,44 @@ class AuditLogger:
         "private",
     }
 
-    def __init__(self, audit_dir: str = "./audit_logs"):
+    # Single matcher for any sensitive word in a lowercased key
+    _SENSITIVE_RE: ClassVar["re.Pattern"] = re.compile(
+        "|".join(map(re.escape, sorted(SENSITIVE_KEYS, key=len, reverse=True)))
+    )
+
+    # Write buffer size for cached log handles
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, audit_dir: str = "./audit_logs", fsync_interval: int = 64):
+        """
+        Initialize audit logger.
+
+        Args:
+            audit_dir: Directory for JSONL log files
+            fsync_interval: Number of writes between fsyncs to disk
+        """
         self.audit_dir = audit_dir
+        self.fsync_interval = fsync_interval
+        self._writes_since_fsync = 0
         os.makedirs(audit_dir, exist_ok=True)
+        # session_id -> (log_path, open append handle)
+        self._handles: Dict[str, Tuple[str, BinaryIO]] = {}
+
+    def __enter__(self) -> "AuditLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def _get_log_path(self, session_id: str) -> str:
         """Get log file path for session."""
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = now_iso()[:10]  # YYYY-MM-DD
         return os.path.join(self.audit_dir, f"{date}_{session_id}.jsonl")
 
     def log(
@@ -77,70 +168,134 @@ class AuditLogger:
             action: Action type (e.g., "tool_call", "permission_requested")
             tool_name: Name of tool being called
             parameters: Tool parameters (will be sanitized)
-            result_summary: Brief summary of result
+            result_summary: Brief summary of result (truncated to 500 chars)
             user_approved: Whether user approved this action
         """
         entry = AuditEntry(
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso(),
             session_id=session_id,
             action=action,
             tool_name=tool_name,
             parameters=self._sanitize_params(parameters or {}),
-            result_summary=result_summary[:500],  # Limit summary size
+            result_summary=result_summary[:500],
             user_approved=user_approved,
         )
 
         # Append to log file (JSONL format for append-only)
+        handle = self._get_handle(session_id)
+        handle.write(_dumps_line({f: getattr(entry, f) for f in _ENTRY_FIELDS}))
+        handle.flush()
+
+        # Denied actions are fsynced immediately; others every fsync_interval writes
+        self._writes_since_fsync += 1
+        if not user_approved:
+            self._sync(handle)
+        if self._writes_since_fsync >= self.fsync_interval:
+            self.flush_all()
+
+    @staticmethod
+    def _sync(handle: BinaryIO):
+        """Flush a handle's buffer and fsync it to disk."""
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    def _get_handle(self, session_id: str) -> BinaryIO:
+        """Get cached append handle for session, rotating when the date changes."""
         log_path = self._get_log_path(session_id)
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(entry)) + "\n")
+        cached = self._handles.get(session_id)
+        if cached is not None:
+            if cached[0] == log_path:
+                return cached[1]
+            self._sync(cached[1])
+            cached[1].close()
+
+        handle = open(log_path, "ab", buffering=self.BUFFER_SIZE)
+        self._handles[session_id] = (log_path, handle)
+        return handle
+
+    def _session_log_paths(self, session_id: str) -> List[str]:
+        """Log files for one session, found by a directory scan filtered on name."""
+        # Files are named {YYYY-MM-DD}_{session_id}.jsonl
+        suffix = f"_{session_id}.jsonl"
+        name_len = 10 + len(suffix)
+        with os.scandir(self.audit_dir) as it:
+            return [
+                entry.path
+                for entry in it
+                if len(entry.name) == name_len and entry.name.endswith(suffix)
+            ]
+
+    def flush(self):
+        """Flush buffered entries for all sessions to disk."""
+        for _, handle in self._handles.values():
+            handle.flush()
+
+    def flush_all(self):
+        """Flush and fsync all cached log handles (e.g. from a shutdown hook)."""
+        for _, handle in self._handles.values():
+            self._sync(handle)
+        self._writes_since_fsync = 0
+
+    def close(self):
+        """Sync and close all cached log handles."""
+        self.flush_all()
+        handles = self._handles
+        self._handles = {}
+        for _, handle in handles.values():
+            handle.close()
 
     def _sanitize_params(self, params: Dict) -> Dict:
         """Remove sensitive data from parameters before logging."""
-        sanitized = {}
-
-        for k, v in params.items():
-            key_lower = k.lower()
-
-            # Check if key contains sensitive words
-            if any(s in key_lower for s in self.SENSITIVE_KEYS):
-                sanitized[k] = "[REDACTED]"
-            elif isinstance(v, str):
-                # Truncate long strings
-                if len(v) > 1000:
-                    sanitized[k] = f"[{len(v)} chars]"
+        sensitive = self._SENSITIVE_RE.search
+        _isinstance = isinstance
+
+        root: Dict = {}
+        # Iterative walk over (source, destination) dict pairs
+        stack = [(params, root)]
+        while stack:
+            src, dst = stack.pop()
+            for k, v in src.items():
+                # Check if key contains sensitive words
+                if sensitive(k.lower()) is not None:
+                    dst[k] = "[REDACTED]"
+                elif _isinstance(v, str):
+                    # Truncate long strings
+                    dst[k] = f"[{len(v)} chars]" if len(v) > 1000 else v
+                elif _isinstance(v, dict):
+                    # Sanitize nested dicts
+                    child: Dict = {}
+                    dst[k] = child
+                    stack.append((v, child))
+                elif _isinstance(v, list):
+                    # Truncate long lists
+                    dst[k] = f"[{len(v)} items]" if len(v) > 10 else v
                 else:
-                    sanitized[k] = v
-            elif isinstance(v, dict):
-                # Recursively sanitize nested dicts
-                sanitized[k] = self._sanitize_params(v)
-            elif isinstance(v, list):
-                # Truncate long lists
-                if len(v) > 10:
-                    sanitized[k] = f"[{len(v)} items]"
-                else:
-                    sanitized[k] = v
-            else:
-                sanitized[k] = v
+                    dst[k] = v
 
-        return sanitized
+        return root
 
-    def get_session_log(self, session_id: str) -> List[Dict]:
-        """Retrieve all entries for a session."""
-        entries = []
+    def iter_session_log(self, session_id: str) -> Iterator[Dict]:
+        """
+        Yield entries for a session in chronological order without loading them all.
 
-        # Check all log files for this session
-        for filename in os.listdir(self.audit_dir):
-            if session_id in filename and filename.endswith(".jsonl"):
-                log_path = os.path.join(self.audit_dir, filename)
-                with open(log_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            entries.append(json.loads(line))
+        Log files are named {YYYY-MM-DD}_{session_id}.jsonl, so filename order
+        is date order, and entries within a file are in append order.
+        """
+        self.flush()
+        # Rescan on every query so logs written by other loggers are included
+        for log_path in sorted(self._session_log_paths(session_id)):
+            try:
+                f = open(log_path, "rb")
+            except FileNotFoundError:
+                continue  # Removed since the scan
+            with f:
+                for line in f:
+                    if line.strip():
+                        yield _loads(line)
 
-        # Sort by timestamp
-        entries.sort(key=lambda x: x.get("timestamp", ""))
-        return entries
+    def get_session_log(self, session_id: str) -> List[Dict]:
+        """Retrieve all entries for a session."""
+        return list(self.iter_session_log(session_id))
 
     def verify_integrity(self, session_id: str) -> Tuple[bool, List[str]]:
         """
@@ -149,44 +304,56 @@ class AuditLogger:
         Returns:
             Tuple of (is_valid, list_of_issues)
         """
-        entries = self.get_session_log(session_id)
         issues = []
 
-        for i, entry in enumerate(entries):
-            content = (
-                f"{entry['timestamp']}|{entry['session_id']}|"
-                f"{entry['action']}|{entry['tool_name']}|{entry['result_summary']}"
+        for i, entry in enumerate(self.iter_session_log(session_id)):
+            digest = _DIGESTS.get(entry.get("algo", "sha256"))
+            if digest is None:
+                issues.append(f"Entry {i}: Unknown hash algorithm {entry['algo']!r}")
+                continue
+
+            content = _entry_content(
+                entry["timestamp"],
+                entry["session_id"],
+                entry["action"],
+                entry["tool_name"],
+                entry["result_summary"],
             )
-            expected_hash = hashlib.sha256(content.encode()).hexdigest()[:32]
+            try:
+                stored = bytes.fromhex(entry.get("hash") or "")
+            except ValueError:
+                stored = b""
 
-            if entry.get("hash") != expected_hash:
+            if digest(content) != stored:
                 issues.append(f"Entry {i}: Hash mismatch (possible tampering)")
 
         return len(issues) == 0, issues
 
     def get_session_summary(self, session_id: str) -> Dict:
         """Get summary statistics for a session."""
-        entries = self.get_session_log(session_id)
-
-        if not entries:
-            return {"total_actions": 0}
-
-        tool_counts = {}
+        tool_counts: Counter = Counter()
         denied_count = 0
+        first_action = last_action = None
 
-        for entry in entries:
-            tool = entry.get("tool_name", "unknown")
-            tool_counts[tool] = tool_counts.get(tool, 0) + 1
-
+        # Single pass over the log
+        for entry in self.iter_session_log(session_id):
+            tool_counts[entry.get("tool_name", "unknown")] += 1
             if not entry.get("user_approved", True):
                 denied_count += 1
+            if first_action is None:
+                first_action = entry.get("timestamp")
+            last_action = entry.get("timestamp")
+
+        total = sum(tool_counts.values())
+        if not total:
+            return {"total_actions": 0}
 
         return {
-            "total_actions": len(entries),
-            "tool_counts": tool_counts,
+            "total_actions": total,
+            "tool_counts": dict(tool_counts),
             "denied_actions": denied_count,
-            "first_action": entries[0].get("timestamp") if entries else None,
-            "last_action": entries[-1].get("timestamp") if entries else None,
+            "first_action": first_action,
+            "last_action": last_action,
         }
 
     def export_session(self, session_id: str, output_path: str):
@@ -196,7 +363,7 @@ class AuditLogger:
 
         export_data = {
             "session_id": session_id,
-            "exported_at": datetime.now().isoformat(),
+            "exported_at": now_iso(),
             "integrity_valid": is_valid,
             "integrity_issues": issues,
             "summary": self.get_session_summary(session_id),
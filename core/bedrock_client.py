@@ -6,9 +6,128 @@ Supports mock mode for testing without Bedrock access.
 import boto3
 import json
 import re
-from typing import Generator, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
+
+def _encode_body(
+    messages: List[Dict],
+    system: str,
+    tools: Optional[List[Dict]],
+    max_tokens: int,
+    temperature: float,
+) -> bytes:
+    """Serialize a Messages API request body once, as bytes for boto3."""
+    body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "system": system,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    if tools:
+        body["tools"] = tools
+    return _dumps(body)
+
+
+# Stream events whose only used field is "type"
+_META_ONLY_EVENTS = frozenset((b"content_block_stop", b"message_stop", b"ping"))
+_EVENT_TYPE_RE = re.compile(rb'"type"\s*:\s*"([a-z_]+)"')
+
+
+def _parse_event(raw: bytes) -> dict:
+    """Parse a stream event, skipping the full JSON parse for metadata-only events."""
+    # Single "type" key means no nested blocks/deltas to decode
+    if raw.count(b'"type"') == 1:
+        m = _EVENT_TYPE_RE.search(raw)
+        if m and m.group(1) in _META_ONLY_EVENTS:
+            return {"type": m.group(1).decode()}
+    return _loads(raw)
+
+
+class _StreamAccumulator:
+    """
+    Builds a response from stream events via a type -> handler table.
+
+    Deltas are accumulated as lists and joined once per content block.
+    """
+
+    def __init__(self, on_text: Optional[callable] = None):
+        self.on_text = on_text
+        self.content_blocks: List[Dict] = []
+        self.current_block: Optional[Dict] = None
+        self.text_parts: List[str] = []
+        self.json_parts: List[str] = []
+        self.stop_reason = ""
+        self.usage: Dict = {}
+        self.handlers = {
+            "content_block_start": self._block_start,
+            "content_block_delta": self._block_delta,
+            "content_block_stop": self._block_stop,
+            "message_delta": self._message_delta,
+        }
+
+    def _block_start(self, chunk: Dict):
+        block = self.current_block = chunk.get("content_block", {})
+        self.text_parts = []
+        self.json_parts = []
+        if block.get("type") == "text":
+            self.text_parts.append(block.get("text", ""))
+
+    def _block_delta(self, chunk: Dict):
+        delta = chunk.get("delta", {})
+        delta_type = delta.get("type")
+        if delta_type == "text_delta":
+            text = delta.get("text", "")
+            self.text_parts.append(text)
+            if self.on_text:
+                self.on_text(text)
+        elif delta_type == "input_json_delta":
+            # Tool input being streamed
+            if self.current_block:
+                self.json_parts.append(delta.get("partial_json", ""))
+
+    def _block_stop(self, chunk: Dict):
+        block = self.current_block
+        if block:
+            block_type = block.get("type")
+            if block_type == "text":
+                block["text"] = "".join(self.text_parts)
+            elif block_type == "tool_use" and self.json_parts:
+                # Parse the accumulated JSON once the block is complete
+                try:
+                    block["input"] = _loads("".join(self.json_parts))
+                except json.JSONDecodeError:
+                    block["input"] = {}
+            self.content_blocks.append(block)
+        self.current_block = None
+        self.text_parts = []
+        self.json_parts = []
+
+    def _message_delta(self, chunk: Dict):
+        self.stop_reason = chunk.get("delta", {}).get("stop_reason", "")
+        self.usage = chunk.get("usage", {})
+
+    def result(self) -> Dict:
+        """Final response dict in the non-streaming API shape."""
+        return {"content": self.content_blocks, "stop_reason": self.stop_reason, "usage": self.usage}
+
 
 @dataclass
 class ToolCall:
@@ -29,6 +148,70 @@ class Response:
     usage: dict
 
 
+_MOCK_USAGE = {"input_tokens": 100, "output_tokens": 50}
+
+
+def _mock_tool_response(text: str, tool_call: ToolCall) -> Response:
+    return Response(text=text, tool_calls=[tool_call], stop_reason="tool_use", usage=dict(_MOCK_USAGE))
+
+
+def _mock_list_dir() -> Response:
+    return _mock_tool_response(
+        "I'll list the files for you.", ToolCall(id="mock_1", name="list_dir", input={"path": "."})
+    )
+
+
+def _mock_read_file() -> Response:
+    return _mock_tool_response(
+        "I'll read that file.", ToolCall(id="mock_2", name="read_file", input={"file_path": "config.py"})
+    )
+
+
+def _mock_grep() -> Response:
+    return _mock_tool_response(
+        "I'll search for that.", ToolCall(id="mock_3", name="grep", input={"pattern": "TODO", "path": "."})
+    )
+
+
+# (keywords that must all appear, response factory), checked in order
+_MOCK_RULES = (
+    (("list", "file"), _mock_list_dir),
+    (("read",), _mock_read_file),
+    (("search",), _mock_grep),
+    (("find",), _mock_grep),
+)
+
+
+def _probe_model(runtime, model_id: str, display_name: str, region: str) -> Tuple[bool, Dict]:
+    """
+    Check whether a model can be invoked.
+
+    Returns:
+        Tuple of (available, model info or permission issue)
+    """
+    try:
+        # Test invoke with minimal tokens
+        runtime.invoke_model(
+            modelId=model_id,
+            body=_dumps(
+                {
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "max_tokens": 10,
+                    "messages": [{"role": "user", "content": "Hi"}],
+                }
+            ),
+            contentType="application/json",
+        )
+        return True, {"id": model_id, "name": display_name, "status": "available"}
+    except runtime.exceptions.AccessDeniedException:
+        error = "Access denied - model not enabled"
+    except runtime.exceptions.ValidationException:
+        error = f"Not available in {region}"
+    except Exception as e:
+        error = str(e)
+    return False, {"model": model_id, "name": display_name, "error": error}
+
+
 class BedrockClient:
     """Client for AWS Bedrock Claude models."""
 
@@ -58,37 +241,16 @@ class BedrockClient:
         # Simple mock logic based on message content
         if isinstance(last_msg, str):
             msg_lower = last_msg.lower()
-
-            # If asking to list/read files, mock a tool call
-            if "list" in msg_lower and "file" in msg_lower:
-                return Response(
-                    text="I'll list the files for you.",
-                    tool_calls=[ToolCall(id="mock_1", name="list_dir", input={"path": "."})],
-                    stop_reason="tool_use",
-                    usage={"input_tokens": 100, "output_tokens": 50}
-                )
-            elif "read" in msg_lower:
-                # Extract filename if mentioned
-                return Response(
-                    text="I'll read that file.",
-                    tool_calls=[ToolCall(id="mock_2", name="read_file", input={"file_path": "config.py"})],
-                    stop_reason="tool_use",
-                    usage={"input_tokens": 100, "output_tokens": 50}
-                )
-            elif "search" in msg_lower or "find" in msg_lower:
-                return Response(
-                    text="I'll search for that.",
-                    tool_calls=[ToolCall(id="mock_3", name="grep", input={"pattern": "TODO", "path": "."})],
-                    stop_reason="tool_use",
-                    usage={"input_tokens": 100, "output_tokens": 50}
-                )
+            for keywords, make_response in _MOCK_RULES:
+                if all(k in msg_lower for k in keywords):
+                    return make_response()
 
         # Default: just return text
         return Response(
             text=f"[MOCK] I received your message. In mock mode, I can simulate tool calls but not actually reason. Your message was: {str(last_msg)[:100]}...",
             tool_calls=[],
             stop_reason="end_turn",
-            usage={"input_tokens": 100, "output_tokens": 50}
+            usage=dict(_MOCK_USAGE),
         )
 
     def chat(
@@ -116,24 +278,13 @@ class BedrockClient:
         if self.mock_mode:
             return self._mock_response(messages, tools)
 
-        body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "system": system,
-            "messages": messages,
-            "temperature": temperature,
-        }
-
-        if tools:
-            body["tools"] = tools
-
         response = self.client.invoke_model(
             modelId=self.model_id,
-            body=json.dumps(body),
+            body=_encode_body(messages, system, tools, max_tokens, temperature),
             contentType="application/json",
         )
 
-        result = json.loads(response["body"].read())
+        result = _loads(response["body"].read())
         return self._parse_response(result)
 
     def stream_chat(
@@ -166,80 +317,22 @@ class BedrockClient:
                 on_text(response.text)
             return response
 
-        body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "system": system,
-            "messages": messages,
-            "temperature": temperature,
-        }
-
-        if tools:
-            body["tools"] = tools
-
         response = self.client.invoke_model_with_response_stream(
             modelId=self.model_id,
-            body=json.dumps(body),
+            body=_encode_body(messages, system, tools, max_tokens, temperature),
             contentType="application/json",
         )
 
         # Collect streaming response
-        content_blocks = []
-        current_block = None
-        current_text = ""
-        stop_reason = ""
-        usage = {}
-
+        acc = _StreamAccumulator(on_text)
+        handlers = acc.handlers
         for event in response["body"]:
-            chunk = json.loads(event["chunk"]["bytes"])
-            event_type = chunk.get("type")
-
-            if event_type == "content_block_start":
-                current_block = chunk.get("content_block", {})
-                if current_block.get("type") == "text":
-                    current_text = current_block.get("text", "")
-
-            elif event_type == "content_block_delta":
-                delta = chunk.get("delta", {})
-                if delta.get("type") == "text_delta":
-                    text = delta.get("text", "")
-                    current_text += text
-                    if on_text:
-                        on_text(text)
-                elif delta.get("type") == "input_json_delta":
-                    # Tool input being streamed
-                    if current_block:
-                        current_block["partial_input"] = current_block.get("partial_input", "") + delta.get(
-                            "partial_json", ""
-                        )
-
-            elif event_type == "content_block_stop":
-                if current_block:
-                    if current_block.get("type") == "text":
-                        current_block["text"] = current_text
-                    elif current_block.get("type") == "tool_use":
-                        # Parse the accumulated JSON
-                        if "partial_input" in current_block:
-                            try:
-                                current_block["input"] = json.loads(current_block["partial_input"])
-                            except json.JSONDecodeError:
-                                current_block["input"] = {}
-                            del current_block["partial_input"]
-                    content_blocks.append(current_block)
-                current_block = None
-                current_text = ""
-
-            elif event_type == "message_delta":
-                stop_reason = chunk.get("delta", {}).get("stop_reason", "")
-                usage = chunk.get("usage", {})
-
-            elif event_type == "message_stop":
-                pass
-
-        # Build final result
-        result = {"content": content_blocks, "stop_reason": stop_reason, "usage": usage}
+            chunk = _parse_event(event["chunk"]["bytes"])
+            handler = handlers.get(chunk.get("type"))
+            if handler is not None:
+                handler(chunk)
 
-        return self._parse_response(result)
+        return self._parse_response(acc.result())
 
     def _parse_response(self, result: dict) -> Response:
         """Parse Bedrock response into Response object."""
@@ -294,38 +387,18 @@ class BedrockClient:
             ("anthropic.claude-3-haiku-20240307-v1:0", "Claude 3 Haiku"),
         ]
 
-        for model_id, display_name in claude_models:
-            try:
-                # Test invoke with minimal tokens
-                response = runtime.invoke_model(
-                    modelId=model_id,
-                    body=json.dumps(
-                        {
-                            "anthropic_version": "bedrock-2023-05-31",
-                            "max_tokens": 10,
-                            "messages": [{"role": "user", "content": "Hi"}],
-                        }
-                    ),
-                    contentType="application/json",
-                )
-                results["available_models"].append(
-                    {"id": model_id, "name": display_name, "status": "available"}
-                )
+        # Probe models concurrently; map() keeps results in priority order
+        with ThreadPoolExecutor(max_workers=len(claude_models)) as pool:
+            probes = list(
+                pool.map(lambda m: _probe_model(runtime, m[0], m[1], region), claude_models)
+            )
 
+        for available, info in probes:
+            if available:
+                results["available_models"].append(info)
                 if results["recommended_model"] is None:
-                    results["recommended_model"] = model_id
-
-            except runtime.exceptions.AccessDeniedException:
-                results["permission_issues"].append(
-                    {"model": model_id, "name": display_name, "error": "Access denied - model not enabled"}
-                )
-            except runtime.exceptions.ValidationException:
-                results["permission_issues"].append(
-                    {"model": model_id, "name": display_name, "error": f"Not available in {region}"}
-                )
-            except Exception as e:
-                results["permission_issues"].append(
-                    {"model": model_id, "name": display_name, "error": str(e)}
-                )
+                    results["recommended_model"] = info["id"]
+            else:
+                results["permission_issues"].append(info)
 
         return results
@@ -1,11 +1,34 @@
 """
 Context Manager - Monitors context usage and handles compaction
 """
+import hashlib
 import json
+import logging
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Iterator
+from dataclasses import dataclass
+
+from .timeutil import now_iso
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _write_json_atomic(path: str, obj: Dict):
+    """Write indented JSON to a temp file, then atomically replace the target."""
+    tmp_path = path + ".tmp"
+    if orjson is not None:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
 
 
 @dataclass
@@ -21,6 +44,12 @@ class ContextCheckpoint:
     next_steps: List[str]
 
 
+def _block_text(block: Dict) -> str:
+    """Text of a content block (text, else tool result content)."""
+    text = block.get("text", "") or block.get("content", "")
+    return text if isinstance(text, str) else str(text)
+
+
 class ContextManager:
     """Monitors context usage and handles compaction."""
 
@@ -41,32 +70,61 @@ class ContextManager:
         self.checkpoint_path = os.path.join(workspace_dir, "_context_checkpoint.json")
         self.message_count = 0
         self.last_warning_level = 0
+        # Single background writer so checkpoint I/O stays off the request path
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._pending_write: Optional[Future] = None
+        self._last_checkpoint_hash: Optional[bytes] = None
+        # id(message) -> (message, char count)
+        self._char_cache: Dict[int, Tuple[Dict, int]] = {}
+
+    @staticmethod
+    def _iter_message_strs(m: Dict) -> Iterator[str]:
+        """Yield the strings in a message that count towards its token estimate."""
+        content = m.get("content", "")
+        if isinstance(content, str):
+            yield content
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict):
+                    text = block.get("text", "")
+                    yield text if type(text) is str else str(text)
+                    inner = block.get("content", "")
+                    yield inner if type(inner) is str else str(inner)
+                else:
+                    yield str(block)
+        else:
+            yield str(content)
+
+    def _message_chars(self, m: Dict) -> int:
+        """Count content characters in a single message."""
+        return sum(map(len, self._iter_message_strs(m)))
 
     def estimate_tokens(self, messages: List[Dict]) -> int:
         """
         Rough token estimation (4 chars = 1 token).
 
+        Per-message counts are cached by message identity, so repeated checks
+        over a growing conversation only count newly added messages.
+
         Args:
             messages: List of conversation messages
 
         Returns:
             Estimated token count
         """
+        cache = self._char_cache
+        # Rebuilt each call so it only holds messages still in the conversation
+        new_cache = {}
         total_chars = 0
         for m in messages:
-            content = m.get("content", "")
-            if isinstance(content, str):
-                total_chars += len(content)
-            elif isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict):
-                        total_chars += len(str(block.get("text", "")))
-                        total_chars += len(str(block.get("content", "")))
-                    else:
-                        total_chars += len(str(block))
-            else:
-                total_chars += len(str(content))
-
+            key = id(m)
+            hit = cache.get(key)
+            # Entry holds a reference to m, so its id can't be reused while cached
+            chars = hit[1] if hit is not None and hit[0] is m else self._message_chars(m)
+            new_cache[key] = (m, chars)
+            total_chars += chars
+
+        self._char_cache = new_cache
         return total_chars // 4
 
     def get_usage_percent(self, messages: List[Dict]) -> float:
@@ -92,8 +150,8 @@ class ContextManager:
         Returns:
             Warning message or None
         """
-        usage = self.get_usage_percent(messages)
         tokens = self.estimate_tokens(messages)
+        usage = tokens / self.MAX_TOKENS
 
         if usage >= self.WARNING_THRESHOLD_95:
             if self.last_warning_level < 95:
@@ -108,8 +166,9 @@ class ContextManager:
         elif usage >= self.WARNING_THRESHOLD_80:
             if self.last_warning_level < 80:
                 self.last_warning_level = 80
+                # Written in the background; failures are logged and raised by flush()
                 self.save_checkpoint(messages)
-                return f"[i] Context at 80% ({tokens:,}/{self.MAX_TOKENS:,} tokens). Checkpoint saved."
+                return f"[i] Context at 80% ({tokens:,}/{self.MAX_TOKENS:,} tokens). Checkpoint scheduled."
 
         return None
 
@@ -119,56 +178,92 @@ class ContextManager:
         current_task: str = "",
         important_data: Optional[Dict] = None,
         next_steps: Optional[List[str]] = None,
-    ):
+    ) -> Future:
         """
         Save context checkpoint before potential compaction.
 
+        The checkpoint is built immediately and written in the background;
+        readers of the checkpoint wait for the write to land.
+
         Args:
             messages: Current conversation messages
             current_task: Description of current task
             important_data: Important data to preserve
             next_steps: List of planned next steps
+
+        Returns:
+            Future that completes when the checkpoint is on disk
         """
-        # Extract last 3 user/assistant messages
-        user_msgs = []
-        asst_msgs = []
+        # Extract last 3 user/assistant messages, walking back from the end
+        recent: Dict[str, List[str]] = {"user": [], "assistant": []}
 
-        for m in messages:
-            role = m.get("role", "")
-            content = m.get("content", "")
+        for m in reversed(messages):
+            bucket = recent.get(m.get("role", ""))
+            if bucket is None or len(bucket) >= 3:
+                continue
 
-            # Convert content to string
+            # Convert content to string, truncated to 500 chars
+            content = m.get("content", "")
             if isinstance(content, list):
-                text_parts = []
-                for block in content:
-                    if isinstance(block, dict):
-                        text_parts.append(block.get("text", "") or block.get("content", ""))
-                    else:
-                        text_parts.append(str(block))
-                content_str = " ".join(text_parts)
+                content_str = " ".join(
+                    _block_text(b) if isinstance(b, dict) else str(b) for b in content
+                )
             else:
                 content_str = str(content)
+            bucket.append(content_str[:500])
 
-            # Truncate to 500 chars
-            content_str = content_str[:500]
+            if len(recent["user"]) >= 3 and len(recent["assistant"]) >= 3:
+                break
 
-            if role == "user":
-                user_msgs.append(content_str)
-            elif role == "assistant":
-                asst_msgs.append(content_str)
+        user_msgs = recent["user"][::-1]
+        asst_msgs = recent["assistant"][::-1]
 
         checkpoint = ContextCheckpoint(
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso(),
             context_usage_percent=self.get_usage_percent(messages),
             current_task=current_task,
-            important_data=important_data or {},
+            # Shallow copy - the write happens on another thread
+            important_data=dict(important_data or {}),
             last_user_messages=user_msgs[-3:],
             last_assistant_messages=asst_msgs[-3:],
             next_steps=next_steps or [],
         )
 
-        with open(self.checkpoint_path, "w", encoding="utf-8") as f:
-            json.dump(asdict(checkpoint), f, indent=2)
+        # Skip the write if nothing but the timestamp changed since the last save
+        content = {k: v for k, v in checkpoint.__dict__.items() if k != "timestamp"}
+        raw = orjson.dumps(content) if orjson is not None else json.dumps(content).encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest == self._last_checkpoint_hash:
+            if self._pending_write is not None:
+                return self._pending_write
+            if os.path.exists(self.checkpoint_path):
+                done: Future = Future()
+                done.set_result(None)
+                return done
+        self._last_checkpoint_hash = digest
+
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        future = self._io.submit(_write_json_atomic, self.checkpoint_path, checkpoint.__dict__)
+        future.add_done_callback(lambda f: self._checkpoint_written(f, digest))
+        self._pending_write = future
+        return future
+
+    def _checkpoint_written(self, future: Future, digest: bytes):
+        """Log a failed background write and let the next save retry it."""
+        exc = future.exception()
+        if exc is None:
+            return
+        logger.error("Failed to write context checkpoint %s: %s", self.checkpoint_path, exc)
+        if self._last_checkpoint_hash == digest:
+            self._last_checkpoint_hash = None
+
+    def flush(self):
+        """Wait for any in-flight checkpoint write to finish, raising its error."""
+        pending = self._pending_write
+        if pending is not None:
+            self._pending_write = None
+            pending.result()
 
     def load_checkpoint(self) -> Optional[ContextCheckpoint]:
         """
@@ -177,22 +272,26 @@ class ContextManager:
         Returns:
             ContextCheckpoint or None if not found
         """
+        self.flush()
         if not os.path.exists(self.checkpoint_path):
             return None
 
         try:
-            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return ContextCheckpoint(**data)
+            with open(self.checkpoint_path, "rb") as f:
+                raw = f.read()
+            return ContextCheckpoint(**(orjson.loads(raw) if orjson is not None else json.loads(raw)))
         except (json.JSONDecodeError, TypeError):
             return None
 
     def has_checkpoint(self) -> bool:
         """Check if checkpoint exists."""
+        self.flush()
         return os.path.exists(self.checkpoint_path)
 
     def delete_checkpoint(self):
         """Delete checkpoint after task complete."""
+        self.flush()
+        self._last_checkpoint_hash = None
         if os.path.exists(self.checkpoint_path):
             os.remove(self.checkpoint_path)
 
@@ -1,11 +1,81 @@
 """
 Session Memory - Persistent session storage
 """
+import atexit
 import json
 import os
+import sqlite3
+import weakref
 from datetime import datetime
 from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
+
+from .timeutil import now_iso
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to stdlib json
+    orjson = None
+
+
+def _read_json(path: str) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _write_json(path: str, obj: Any):
+    """Write an object as indented JSON."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+
+
+def _write_json_atomic(path: str, obj: Any):
+    """Write JSON to a temp file, then atomically replace the target."""
+    tmp_path = path + ".tmp"
+    _write_json(tmp_path, obj)
+    os.replace(tmp_path, path)
+
+
+def _stat_sig(path: str) -> str:
+    """Change signature (mtime and size) of a file, or "-" if it is missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _flush_at_exit(ref: "weakref.ref"):
+    """Write a live SessionManager's pending index entries at interpreter exit."""
+    manager = ref()
+    if manager is not None:
+        try:
+            manager.close()
+        except OSError:
+            pass
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize an object as a single JSONL line (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+def _read_jsonl(path: str) -> List[Any]:
+    """Read all records from a JSONL file (empty list if missing)."""
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        with open(path, "rb") as f:
+            return [loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
 
 
 @dataclass
@@ -20,8 +90,36 @@ class Session:
     metadata: Dict = field(default_factory=dict)
 
 
+def _session_to_dict(session: Session) -> Dict:
+    """Shallow dict of a session for serialization (asdict deep-copies messages)."""
+    return {
+        "id": session.id,
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "title": session.title,
+        "messages": session.messages,
+        "metadata": session.metadata,
+    }
+
+
 class SessionManager:
-    """Manages session persistence."""
+    """
+    Manages session persistence.
+
+    Each session is a <id>.json snapshot plus an append-only
+    <id>.messages.jsonl shard holding messages added since the snapshot.
+    Session summaries are kept in an _index.json manifest for listing
+    (rewritten on snapshot, delete or close(), not per message). Each entry
+    records the shard signature it was built from, so entries left behind
+    by unflushed appends are re-summarized when listed. A rebuildable
+    sqlite FTS5 cache (_search.db) speeds up search.
+    """
+
+    INDEX_FILENAME = "_index.json"
+    SEARCH_DB_FILENAME = "_search.db"
+
+    # Fold the message shard into the snapshot after this many appends
+    COMPACT_EVERY = 50
 
     def __init__(self, sessions_dir: str = "./sessions"):
         """
@@ -32,6 +130,126 @@ class SessionManager:
         """
         self.sessions_dir = sessions_dir
         os.makedirs(sessions_dir, exist_ok=True)
+        # session_id -> messages appended to shard since last snapshot
+        self._pending: Dict[str, int] = {}
+        # Index entries changed by appends, written with the next snapshot
+        self._index_updates: Dict[str, Dict] = {}
+        self._index_path = os.path.join(sessions_dir, self.INDEX_FILENAME)
+        # sqlite connection, or False if FTS5 trigram search is unavailable
+        self._search_conn = None
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def _session_path(self, session_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{session_id}.json")
+
+    def _shard_path(self, session_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"{session_id}.messages.jsonl")
+
+    def _merge_shard(self, data: Dict) -> Dict:
+        """Append messages from the session's shard to loaded snapshot data."""
+        messages = data.get("messages", [])
+        merged = len(messages)
+        # Records carry their position in the session; those below the
+        # snapshot's length are already in it (a crash between the snapshot
+        # write and the shard unlink leaves them behind). Older shards hold
+        # bare messages, which are always appended
+        shard = [
+            record["message"] if "seq" in record else record
+            for record in _read_jsonl(self._shard_path(data.get("id", "")))
+            if record.get("seq", merged) >= merged
+        ]
+        if shard:
+            data["messages"] = messages + shard
+            data["updated_at"] = shard[-1].get("timestamp", data.get("updated_at"))
+        return data
+
+    def _iter_session_files(self):
+        """Yield paths of non-empty session snapshot files, most recently modified first."""
+        entries = []
+        with os.scandir(self.sessions_dir) as it:
+            for e in it:
+                if not e.name.endswith(".json") or e.name == self.INDEX_FILENAME:
+                    continue
+                if not e.is_file():
+                    continue
+                st = e.stat()
+                if st.st_size > 0:
+                    entries.append((st.st_mtime, e.path))
+
+        entries.sort(reverse=True)
+        for _, path in entries:
+            yield path
+
+    def _summarize(self, data: Dict) -> Dict:
+        """Build an index entry from session data (snapshot plus merged shard)."""
+        return {
+            "id": data.get("id"),
+            "title": data.get("title"),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+            "message_count": len(data.get("messages", [])),
+            "shard_sig": _stat_sig(self._shard_path(data.get("id", ""))),
+        }
+
+    def _refresh_entry(self, session_id: str) -> Optional[Dict]:
+        """Re-summarize a session from its files, or None if it no longer exists."""
+        try:
+            return self._summarize(self._merge_shard(_read_json(self._session_path(session_id))))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def _scan_index(self) -> Dict[str, Dict]:
+        """Rebuild the session index by reading every session file."""
+        index = {}
+        for path in self._iter_session_files():
+            try:
+                data = self._merge_shard(_read_json(path))
+                index[data["id"]] = self._summarize(data)
+            except (json.JSONDecodeError, KeyError):
+                continue
+        return index
+
+    def _read_index(self) -> Dict[str, Dict]:
+        """Load the session index, rebuilding it if missing or corrupt."""
+        try:
+            index = _read_json(self._index_path)
+            if isinstance(index, dict):
+                return index
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        index = self._scan_index()
+        self._write_index(index)
+        return index
+
+    def _write_index(self, index: Dict[str, Dict]):
+        """Atomically replace the index file."""
+        _write_json_atomic(self._index_path, index)
+
+    def _update_index(self, session_id: str, entry: Optional[Dict]):
+        """Set (or remove, if entry is None) a session's index entry, flushing pending ones."""
+        index = self._read_index()
+        index.update(self._index_updates)
+        self._index_updates.clear()
+        if entry is None:
+            index.pop(session_id, None)
+        else:
+            index[session_id] = entry
+        self._write_index(index)
+
+    def flush_index(self):
+        """Write index entries held in memory since the last snapshot."""
+        if self._index_updates:
+            index = self._read_index()
+            index.update(self._index_updates)
+            self._index_updates.clear()
+            self._write_index(index)
+
+    def close(self):
+        """Flush pending index updates and close the search cache."""
+        self.flush_index()
+        if self._search_conn:
+            self._search_conn.close()
+        self._search_conn = None
 
     def create(self, title: str = "New Session") -> Session:
         """
@@ -44,7 +262,7 @@ class SessionManager:
             New Session object
         """
         session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        now = datetime.now().isoformat()
+        now = now_iso()
 
         session = Session(
             id=session_id,
@@ -61,13 +279,21 @@ class SessionManager:
         """
         Save session to disk.
 
+        Atomically replaces the snapshot, then drops the message shard it
+        supersedes.
+
         Args:
             session: Session object to save
         """
-        session.updated_at = datetime.now().isoformat()
-        path = os.path.join(self.sessions_dir, f"{session.id}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(asdict(session), f, indent=2)
+        session.updated_at = now_iso()
+        data = _session_to_dict(session)
+        _write_json_atomic(self._session_path(session.id), data)
+        self._pending.pop(session.id, None)
+        try:
+            os.remove(self._shard_path(session.id))
+        except FileNotFoundError:
+            pass
+        self._update_index(session.id, self._summarize(data))
 
     def load(self, session_id: str) -> Optional[Session]:
         """
@@ -79,12 +305,10 @@ class SessionManager:
         Returns:
             Session object or None if not found
         """
-        path = os.path.join(self.sessions_dir, f"{session_id}.json")
+        path = self._session_path(session_id)
         if not os.path.exists(path):
             return None
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return Session(**data)
+        return Session(**self._merge_shard(_read_json(path)))
 
     def list_sessions(self) -> List[Dict]:
         """
@@ -93,26 +317,29 @@ class SessionManager:
         Returns:
             List of session summaries sorted by update time
         """
-        sessions = []
-        for filename in os.listdir(self.sessions_dir):
-            if filename.endswith(".json"):
-                path = os.path.join(self.sessions_dir, filename)
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    sessions.append(
-                        {
-                            "id": data.get("id"),
-                            "title": data.get("title"),
-                            "created_at": data.get("created_at"),
-                            "updated_at": data.get("updated_at"),
-                            "message_count": len(data.get("messages", [])),
-                        }
-                    )
-                except (json.JSONDecodeError, KeyError):
-                    continue
-
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        index = self._read_index()
+        index.update(self._index_updates)
+
+        # Entries whose shard changed since they were built (e.g. appends by a
+        # manager that never flushed) are re-summarized and written back
+        stale = {
+            session_id: self._refresh_entry(session_id)
+            for session_id, entry in index.items()
+            if entry.get("shard_sig") != _stat_sig(self._shard_path(session_id))
+        }
+        if stale:
+            for session_id, entry in stale.items():
+                if entry is None:
+                    index.pop(session_id)
+                else:
+                    index[session_id] = entry
+            self._index_updates.clear()
+            self._write_index(index)
+
+        sessions = [
+            {k: v for k, v in entry.items() if k != "shard_sig"} for entry in index.values()
+        ]
+        return sorted(sessions, key=lambda x: x.get("updated_at") or "", reverse=True)
 
     def delete(self, session_id: str) -> bool:
         """
@@ -124,9 +351,14 @@ class SessionManager:
         Returns:
             True if deleted, False if not found
         """
-        path = os.path.join(self.sessions_dir, f"{session_id}.json")
+        path = self._session_path(session_id)
         if os.path.exists(path):
             os.remove(path)
+            if os.path.exists(self._shard_path(session_id)):
+                os.remove(self._shard_path(session_id))
+            self._pending.pop(session_id, None)
+            self._index_updates.pop(session_id, None)
+            self._update_index(session_id, None)
             return True
         return False
 
@@ -139,14 +371,38 @@ class SessionManager:
             role: Message role ("user" or "assistant")
             content: Message content
         """
-        session.messages.append(
-            {
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat(),
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": now_iso(),
+        }
+        session.messages.append(message)
+        session.updated_at = message["timestamp"]
+
+        # Append to the shard; rewrite the full snapshot only periodically
+        pending = self._pending.get(session.id, 0) + 1
+        if pending >= self.COMPACT_EVERY:
+            self.save(session)
+            return
+        record = {"seq": len(session.messages) - 1, "message": message}
+        with open(self._shard_path(session.id), "ab") as f:
+            f.write(_dumps_line(record))
+            f.flush()
+            st = os.fstat(f.fileno())
+        self._pending[session.id] = pending
+
+        # Kept in memory; rewriting _index.json per message would cost
+        # O(sessions) each time. Flushed with the next snapshot or close()
+        entry = self._index_updates.get(session.id)
+        if entry is None:
+            entry = self._index_updates[session.id] = {
+                "id": session.id,
+                "title": session.title,
+                "created_at": session.created_at,
             }
-        )
-        self.save(session)
+        entry["updated_at"] = session.updated_at
+        entry["message_count"] = len(session.messages)
+        entry["shard_sig"] = f"{st.st_mtime_ns}:{st.st_size}"
 
     def get_recent_sessions(self, limit: int = 10) -> List[Dict]:
         """
@@ -171,43 +427,124 @@ class SessionManager:
         Returns:
             List of matching session summaries
         """
+        conn = self._get_search_db()
+        # Trigram index can't match queries shorter than 3 chars
+        if conn is None or len(query) < 3:
+            return self._search_sessions_scan(query)
+
+        self._sync_search_db(conn)
+        phrase = '"' + query.replace('"', '""') + '"'
+        rows = conn.execute(
+            "SELECT m.session_id, MAX(m.kind), i.title, i.updated_at "
+            "FROM (SELECT session_id, kind FROM msgs WHERE msgs MATCH ?) AS m "
+            "JOIN indexed AS i ON i.session_id = m.session_id "
+            "GROUP BY m.session_id",
+            (phrase,),
+        ).fetchall()
+
+        # "title" sorts after "content", so MAX prefers a title match
+        results = [
+            {"id": sid, "title": title, "updated_at": updated_at, "match": kind}
+            for sid, kind, title, updated_at in rows
+        ]
+        return sorted(results, key=lambda x: x.get("updated_at") or "", reverse=True)
+
+    def _get_search_db(self) -> Optional[sqlite3.Connection]:
+        """Open the FTS5 search cache, or None if sqlite lacks FTS5 trigram support."""
+        if self._search_conn is None:
+            try:
+                conn = sqlite3.connect(os.path.join(self.sessions_dir, self.SEARCH_DB_FILENAME))
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS msgs "
+                    "USING fts5(session_id UNINDEXED, kind UNINDEXED, text, tokenize='trigram')"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS indexed "
+                    "(session_id TEXT PRIMARY KEY, sig TEXT, title TEXT, updated_at TEXT)"
+                )
+                conn.commit()
+                self._search_conn = conn
+            except sqlite3.Error:
+                self._search_conn = False
+        return self._search_conn or None
+
+    def _file_sig(self, session_id: str) -> str:
+        """Change signature of a session's snapshot and shard files."""
+        return "|".join(
+            _stat_sig(path) for path in (self._session_path(session_id), self._shard_path(session_id))
+        )
+
+    def _sync_search_db(self, conn: sqlite3.Connection):
+        """Reindex sessions whose files changed since they were last indexed."""
+        known = dict(conn.execute("SELECT session_id, sig FROM indexed"))
+        seen = set()
+
+        with conn:
+            for path in self._iter_session_files():
+                session_id = os.path.basename(path)[:-5]
+                seen.add(session_id)
+                sig = self._file_sig(session_id)
+                if known.get(session_id) == sig:
+                    continue
+
+                try:
+                    data = self._merge_shard(_read_json(path))
+                except (json.JSONDecodeError, KeyError, OSError):
+                    continue
+
+                conn.execute("DELETE FROM msgs WHERE session_id = ?", (session_id,))
+                rows = [(session_id, "title", data.get("title", ""))]
+                rows.extend(
+                    (session_id, "content", str(msg.get("content", "")))
+                    for msg in data.get("messages", [])
+                )
+                conn.executemany("INSERT INTO msgs VALUES (?, ?, ?)", rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO indexed VALUES (?, ?, ?, ?)",
+                    (session_id, sig, data.get("title"), data.get("updated_at")),
+                )
+
+            # Drop deleted sessions
+            for session_id in known.keys() - seen:
+                conn.execute("DELETE FROM msgs WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM indexed WHERE session_id = ?", (session_id,))
+
+    def _search_sessions_scan(self, query: str) -> List[Dict]:
+        """Search sessions by reading every session file."""
         query_lower = query.lower()
         results = []
 
-        for filename in os.listdir(self.sessions_dir):
-            if filename.endswith(".json"):
-                path = os.path.join(self.sessions_dir, filename)
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+        for path in self._iter_session_files():
+            try:
+                data = self._merge_shard(_read_json(path))
+
+                # Search in title
+                if query_lower in data.get("title", "").lower():
+                    results.append(
+                        {
+                            "id": data.get("id"),
+                            "title": data.get("title"),
+                            "updated_at": data.get("updated_at"),
+                            "match": "title",
+                        }
+                    )
+                    continue
 
-                    # Search in title
-                    if query_lower in data.get("title", "").lower():
+                # Search in messages
+                for msg in data.get("messages", []):
+                    content = str(msg.get("content", ""))
+                    if query_lower in content.lower():
                         results.append(
                             {
                                 "id": data.get("id"),
                                 "title": data.get("title"),
                                 "updated_at": data.get("updated_at"),
-                                "match": "title",
+                                "match": "content",
                             }
                         )
-                        continue
-
-                    # Search in messages
-                    for msg in data.get("messages", []):
-                        content = str(msg.get("content", ""))
-                        if query_lower in content.lower():
-                            results.append(
-                                {
-                                    "id": data.get("id"),
-                                    "title": data.get("title"),
-                                    "updated_at": data.get("updated_at"),
-                                    "match": "content",
-                                }
-                            )
-                            break
-                except (json.JSONDecodeError, KeyError):
-                    continue
+                        break
+            except (json.JSONDecodeError, KeyError):
+                continue
 
         return sorted(results, key=lambda x: x.get("updated_at", ""), reverse=True)
 
@@ -226,8 +563,7 @@ class SessionManager:
         if not session:
             return False
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(asdict(session), f, indent=2)
+        _write_json(output_path, _session_to_dict(session))
         return True
 
 
@@ -1,11 +1,21 @@
 """
 Permission System - Multi-level approval for tool execution
 """
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Set, Optional, Callable
+from typing import Dict, List, Set, Optional, Callable
 from enum import Enum
 
 
+# Per-call records skip the instance __dict__ where supported (3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Tool groups used by risk assessment
+_HIGH_RISK_TOOLS = frozenset({"bash", "python_exec"})
+_WRITE_TOOLS = frozenset({"write_file", "edit_file"})
+
+
 class PermissionAction(Enum):
     """Permission action types."""
 
@@ -15,7 +25,7 @@ class PermissionAction(Enum):
     ASK_ONCE = "ask_once"  # Ask once per session
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PermissionRequest:
     """Request for user permission."""
 
@@ -25,7 +35,7 @@ class PermissionRequest:
     risk_level: str  # "low", "medium", "high"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PermissionResult:
     """Result of permission check."""
 
@@ -34,6 +44,57 @@ class PermissionResult:
     remember: bool = False  # Remember this decision
 
 
+class _ACLNode:
+    """One path segment in an ACLTrie."""
+
+    __slots__ = ("children", "terminal", "prefixes")
+
+    def __init__(self):
+        self.children: Dict[str, "_ACLNode"] = {}
+        self.terminal = False
+        self.prefixes: List[str] = []  # trailing-glob patterns anchored here
+
+
+class ACLTrie:
+    """
+    Tool/target patterns indexed as a trie of "/"-separated target segments.
+
+    A pattern ending in "*" matches any target that starts with the text before
+    it (so "*" matches everything and "git *" matches any git command). Other
+    "*" characters are literal.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, _ACLNode] = {}
+
+    def add(self, tool_name: str, target_pattern: str):
+        """Add a tool/target pattern."""
+        node = self._tools.setdefault(tool_name, _ACLNode())
+        segments = target_pattern.split("/")
+        for i, segment in enumerate(segments):
+            if i == len(segments) - 1 and segment.endswith("*"):
+                node.prefixes.append(segment[:-1])
+                return
+            node = node.children.setdefault(segment, _ACLNode())
+        node.terminal = True
+
+    def matches(self, tool_name: str, target: str) -> bool:
+        """Check whether any pattern for the tool matches target."""
+        node = self._tools.get(tool_name)
+        if node is None:
+            return False
+        segments = target.split("/")
+        for i, segment in enumerate(segments):
+            if node.prefixes:
+                rest = "/".join(segments[i:])
+                if any(rest.startswith(p) for p in node.prefixes):
+                    return True
+            node = node.children.get(segment)
+            if node is None:
+                return False
+        return node.terminal
+
+
 class PermissionManager:
     """Multi-level permission system with audit integration."""
 
@@ -60,6 +121,9 @@ class PermissionManager:
         "todo_write": PermissionAction.ALLOW,
     }
 
+    # Targets mentioning any of these are high risk
+    _SENSITIVE_RE = re.compile(r"\.env|secret|password|credential|key|token|auth", re.IGNORECASE)
+
     def __init__(
         self,
         audit_logger=None,
@@ -74,9 +138,14 @@ class PermissionManager:
         """
         self.audit = audit_logger
         self.on_request = on_permission_request
-        self.session_approvals: Dict[str, Set[str]] = {}  # session_id -> approved patterns
+        # session_id -> tool_name -> approved targets ("*" for the whole tool)
+        self.session_approvals: Dict[str, Dict[str, Set[str]]] = {}
+        # Exact "tool:target" entries, including remembered user decisions
         self.always_approved: Set[str] = set()
         self.always_denied: Set[str] = set()
+        # Configured patterns from always_allow()/always_deny()
+        self._approved_patterns = ACLTrie()
+        self._denied_patterns = ACLTrie()
 
     def check_permission(
         self,
@@ -101,7 +170,7 @@ class PermissionManager:
         pattern = f"{tool_name}:{target}"
 
         # Check always-denied list first
-        if pattern in self.always_denied:
+        if pattern in self.always_denied or self._denied_patterns.matches(tool_name, target):
             self._log_decision(session_id, tool_name, target, False, "Always denied")
             return PermissionResult(allowed=False, reason="Always denied")
 
@@ -115,17 +184,18 @@ class PermissionManager:
             return PermissionResult(allowed=False, reason="Tool not permitted")
 
         # Check if in always-approved list
-        if pattern in self.always_approved:
+        if pattern in self.always_approved or self._approved_patterns.matches(tool_name, target):
             return PermissionResult(allowed=True, reason="Always approved")
 
         # Check if already approved for this session (ASK_ONCE)
         if rule == PermissionAction.ASK_ONCE:
-            if session_id in self.session_approvals:
-                # Check for exact match or tool-level approval
-                if pattern in self.session_approvals[session_id]:
-                    return PermissionResult(allowed=True, reason="Previously approved this session")
-                if f"{tool_name}:*" in self.session_approvals[session_id]:
+            approved = self.session_approvals.get(session_id, {}).get(tool_name)
+            if approved:
+                # Check for tool-level approval or exact match
+                if "*" in approved:
                     return PermissionResult(allowed=True, reason="Tool approved for session")
+                if target in approved:
+                    return PermissionResult(allowed=True, reason="Previously approved this session")
 
         # Need to ask user
         if self.on_request:
@@ -142,7 +212,7 @@ class PermissionManager:
 
             # Remember if requested
             if result.remember:
-                self._remember_decision(session_id, pattern, result.allowed)
+                self._remember_decision(session_id, tool_name, target, result.allowed)
 
             return result
 
@@ -151,16 +221,14 @@ class PermissionManager:
 
     def _assess_risk(self, tool_name: str, target: str) -> str:
         """Assess risk level of operation."""
-        high_risk = {"bash", "python_exec"}
-        if tool_name in high_risk:
+        if tool_name in _HIGH_RISK_TOOLS:
             return "high"
 
         # Check target for sensitive patterns
-        sensitive = [".env", "secret", "password", "credential", "key", "token", "auth"]
-        if any(s in target.lower() for s in sensitive):
+        if self._SENSITIVE_RE.search(target):
             return "high"
 
-        if tool_name in {"write_file", "edit_file"}:
+        if tool_name in _WRITE_TOOLS:
             return "medium"
 
         return "low"
@@ -179,28 +247,30 @@ class PermissionManager:
                 user_approved=allowed,
             )
 
-    def _remember_decision(self, session_id: str, pattern: str, allowed: bool):
-        """Remember a permission decision."""
+    def _remember_decision(self, session_id: str, tool_name: str, target: str, allowed: bool):
+        """Remember a permission decision for the exact target only."""
         if allowed:
-            if session_id not in self.session_approvals:
-                self.session_approvals[session_id] = set()
-            self.session_approvals[session_id].add(pattern)
+            self._approve(session_id, tool_name, target)
         else:
-            self.always_denied.add(pattern)
+            self.always_denied.add(f"{tool_name}:{target}")
+
+    def _approve(self, session_id: str, tool_name: str, target: str):
+        """Record a session approval for a tool/target."""
+        self.session_approvals.setdefault(session_id, {}).setdefault(tool_name, set()).add(target)
 
     def approve_tool_for_session(self, session_id: str, tool_name: str):
         """Approve all uses of a tool for this session."""
-        if session_id not in self.session_approvals:
-            self.session_approvals[session_id] = set()
-        self.session_approvals[session_id].add(f"{tool_name}:*")
+        self._approve(session_id, tool_name, "*")
 
     def always_allow(self, tool_name: str, target: str = "*"):
-        """Always allow a specific tool/target combination."""
+        """Always allow a tool/target pattern (a trailing "*" matches any suffix)."""
         self.always_approved.add(f"{tool_name}:{target}")
+        self._approved_patterns.add(tool_name, target)
 
     def always_deny(self, tool_name: str, target: str = "*"):
-        """Always deny a specific tool/target combination."""
+        """Always deny a tool/target pattern (a trailing "*" matches any suffix)."""
         self.always_denied.add(f"{tool_name}:{target}")
+        self._denied_patterns.add(tool_name, target)
 
     def clear_session(self, session_id: str):
         """Clear all approvals for a session."""
@@ -208,5 +278,9 @@ class PermissionManager:
             del self.session_approvals[session_id]
 
     def get_session_approvals(self, session_id: str) -> Set[str]:
-        """Get all approvals for a session."""
-        return self.session_approvals.get(session_id, set())
+        """Get all approvals for a session as "tool:target" patterns."""
+        return {
+            f"{tool_name}:{target}"
+            for tool_name, targets in self.session_approvals.get(session_id, {}).items()
+            for target in targets
+        }
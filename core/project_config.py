@@ -2,7 +2,7 @@
 Project Config - Loads project-specific instructions (like CLAUDE.md/AGENTS.md)
 """
 import os
-from typing import Optional, List
+from typing import Optional, List, Dict, Set
 
 
 class ProjectConfig:
@@ -28,21 +28,44 @@ class ProjectConfig:
         self.workspace_root = workspace_root
         self.instructions: Optional[str] = None
         self.instruction_file: Optional[str] = None
+        self._mtime_ns: Optional[int] = None
         self._load_instructions()
 
+    @staticmethod
+    def _list_files(directory: str) -> Set[str]:
+        """Names of regular files in a directory (empty if unreadable)."""
+        try:
+            with os.scandir(directory) as entries:
+                return {e.name for e in entries if e.is_file()}
+        except OSError:
+            return set()
+
     def _load_instructions(self):
         """Find and load project instruction file."""
+        # One directory listing per candidate directory instead of a stat per file
+        listings: Dict[str, Set[str]] = {}
         for filename in self.INSTRUCTION_FILES:
-            path = os.path.join(self.workspace_root, filename)
-            if os.path.exists(path):
+            subdir, name = os.path.split(filename)
+            if subdir not in listings:
+                listings[subdir] = self._list_files(os.path.join(self.workspace_root, subdir))
+            if name in listings[subdir]:
+                path = os.path.join(self.workspace_root, filename)
                 try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                    if filename == self.instruction_file and mtime_ns == self._mtime_ns:
+                        return  # Unchanged since last read
                     with open(path, "r", encoding="utf-8") as f:
                         self.instructions = f.read()
                     self.instruction_file = filename
+                    self._mtime_ns = mtime_ns
                     return
                 except IOError:
                     continue
 
+        self.instructions = None
+        self.instruction_file = None
+        self._mtime_ns = None
+
     def get_instructions(self) -> str:
         """
         Get project instructions for system prompt.
@@ -66,9 +89,7 @@ class ProjectConfig:
         return self.instructions is not None
 
     def reload(self):
-        """Reload instructions from file."""
-        self.instructions = None
-        self.instruction_file = None
+        """Reload instructions from file (skips the read if it is unchanged)."""
         self._load_instructions()
 
     @staticmethod
@@ -2,8 +2,17 @@
 Prompt Builder - Constructs system prompts from components
 """
 import os
-from typing import Optional
-from datetime import datetime
+import platform
+from typing import Dict, Optional, Tuple
+
+from .timeutil import now_iso
+
+# Process-constant environment details
+_PLATFORM = platform.system()
+_PYTHON_VERSION = platform.python_version()
+
+# System prompt text shared across builders: path -> (mtime_ns, text)
+_system_prompt_cache: Dict[str, Tuple[int, str]] = {}
 
 
 class PromptBuilder:
@@ -17,19 +26,37 @@ class PromptBuilder:
             prompts_dir: Directory containing prompt files
         """
         self.prompts_dir = prompts_dir
+        # Environment section with only the per-call fields left open
+        self._env_template = (
+            "## Environment\n"
+            "- Working directory: {workspace}\n"
+            f"- Platform: {_PLATFORM}\n"
+            "- Date: {date}\n"
+            f"- Python: {_PYTHON_VERSION}\n"
+        )
 
     def load_system_prompt(self) -> str:
         """
         Load main system prompt from file.
 
+        The text is cached per file path, across builders, and re-read
+        only when the file's mtime changes.
+
         Returns:
             System prompt content
         """
-        path = os.path.join(self.prompts_dir, "system.txt")
-        if os.path.exists(path):
+        path = os.path.abspath(os.path.join(self.prompts_dir, "system.txt"))
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = _system_prompt_cache.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
             with open(path, "r", encoding="utf-8") as f:
-                return f.read()
-        return self._get_default_prompt()
+                text = f.read()
+        except FileNotFoundError:
+            return self._get_default_prompt()
+        _system_prompt_cache[path] = (mtime_ns, text)
+        return text
 
     def build(
         self,
@@ -48,36 +75,27 @@ class PromptBuilder:
         Returns:
             Complete system prompt
         """
-        parts = []
-
         # Main system prompt
-        parts.append(self.load_system_prompt())
+        parts = [self.load_system_prompt()]
 
         # Project instructions
         if project_instructions:
             parts.append(project_instructions)
 
         # Environment info
-        env_info = self._build_environment_info(workspace_root)
-        parts.append(env_info)
+        parts.append(self._build_environment_info(workspace_root))
 
         # Context status
         if context_status:
-            status_info = self._build_context_status(context_status)
-            parts.append(status_info)
+            parts.append(self._build_context_status(context_status))
 
         return "\n\n".join(parts)
 
     def _build_environment_info(self, workspace_root: str) -> str:
         """Build environment information section."""
-        import platform
-
-        return f"""## Environment
-- Working directory: {workspace_root}
-- Platform: {platform.system()}
-- Date: {datetime.now().strftime('%Y-%m-%d')}
-- Python: {platform.python_version()}
-"""
+        return self._env_template.format(
+            workspace=workspace_root, date=now_iso()[:10]
+        )
 
     def _build_context_status(self, status: dict) -> str:
         """Build context status section."""
@@ -9,13 +9,36 @@ Enforces:
 """
 import os
 import re
+import sys
 import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Set, Optional, Tuple, List, Dict
+from typing import Set, Optional, Tuple, List, Dict, Union
 from dataclasses import dataclass, field
 
+# Audit hashes are fingerprints, not security primitives (kwarg needs 3.9+)
+_HASH_KWARGS = {"usedforsecurity": False} if sys.version_info >= (3, 9) else {}
 
-@dataclass
+# Dataclass slots need 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _union(patterns: List[Tuple["re.Pattern", str]], flags: int = 0) -> "re.Pattern":
+    """Fuse (compiled, label) pairs into one alternation with a named group per pattern.
+
+    Leading global flags such as ``(?i)`` are rewritten as scoped groups so each
+    alternative keeps its own flags. The group name ``g<i>`` maps back to index i.
+    """
+    parts = []
+    for i, (pattern, _) in enumerate(patterns):
+        source = pattern.pattern
+        if source.startswith("(?i)"):
+            source = f"(?i:{source[4:]})"
+        parts.append(f"(?P<g{i}>{source})")
+    return re.compile("|".join(parts), flags)
+
+
+@dataclass(**_SLOTS)
 class SecurityConfig:
     """Security configuration."""
 
@@ -38,21 +61,31 @@ class SecurityConfig:
 class SecurityManager:
     """Enforces security boundaries for the agent."""
 
-    # Patterns for secret detection
+    # Patterns for secret detection (compiled once at class load)
     SECRET_PATTERNS = [
-        (r"(?i)(api[_-]?key|apikey)\s*[=:]\s*[\"']?[\w-]{20,}", "API Key"),
-        (r"(?i)(secret|password|passwd|pwd)\s*[=:]\s*[\"']?[^\s\"']{8,}", "Password/Secret"),
-        (r"(?i)(aws[_-]?access[_-]?key[_-]?id)\s*[=:]\s*[\"']?[A-Z0-9]{20}", "AWS Access Key"),
-        (r"(?i)(aws[_-]?secret[_-]?access[_-]?key)\s*[=:]\s*[\"']?[A-Za-z0-9/+=]{40}", "AWS Secret Key"),
-        (r"(?i)(bearer\s+)[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+", "JWT Token"),
-        (r"-----BEGIN (RSA |DSA |EC |OPENSSH )?PRIVATE KEY-----", "Private Key"),
-        (r"(?i)(mongodb|postgres|mysql|redis)://[^\s]+:[^\s]+@", "Database Connection String"),
-        (r"(?i)(gh[ps]_[A-Za-z0-9_]{36,})", "GitHub Token"),
-        (r"(?i)(xox[baprs]-[A-Za-z0-9-]+)", "Slack Token"),
+        (re.compile(pattern), secret_type)
+        for pattern, secret_type in [
+            (r"(?i)(api[_-]?key|apikey)\s*[=:]\s*[\"']?[\w-]{20,}", "API Key"),
+            (r"(?i)(secret|password|passwd|pwd)\s*[=:]\s*[\"']?[^\s\"']{8,}", "Password/Secret"),
+            (r"(?i)(aws[_-]?access[_-]?key[_-]?id)\s*[=:]\s*[\"']?[A-Z0-9]{20}", "AWS Access Key"),
+            (r"(?i)(aws[_-]?secret[_-]?access[_-]?key)\s*[=:]\s*[\"']?[A-Za-z0-9/+=]{40}", "AWS Secret Key"),
+            (r"(?i)(bearer\s+)[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+", "JWT Token"),
+            (r"-----BEGIN (RSA |DSA |EC |OPENSSH )?PRIVATE KEY-----", "Private Key"),
+            (r"(?i)(mongodb|postgres|mysql|redis)://[^\s]+:[^\s]+@", "Database Connection String"),
+            (r"(?i)(gh[ps]_[A-Za-z0-9_]{36,})", "GitHub Token"),
+            (r"(?i)(xox[baprs]-[A-Za-z0-9-]+)", "Slack Token"),
+        ]
     ]
+    # All secret patterns in one regex, so clean content is scanned once
+    _SECRET_UNION = _union(SECRET_PATTERNS)
+    # Literals (casefolded) at least one of which every secret pattern requires
+    _SECRET_ANCHORS = (
+        "api", "secret", "passw", "pwd", "aws", "bearer", "private key",
+        "://", "ghp_", "ghs_", "xox",
+    )
 
     # Dangerous file patterns
-    SENSITIVE_FILES = {
+    SENSITIVE_FILES = frozenset({
         ".env",
         ".env.local",
         ".env.production",
@@ -69,28 +102,39 @@ class SecurityManager:
         ".netrc",
         ".npmrc",
         ".pypirc",
-    }
+    })
+
+    # Credential directories whose contents are blocked
+    SENSITIVE_DIRS = frozenset({".aws", ".ssh"})
 
-    # Dangerous command patterns
+    # Any path component starting with these is blocked
+    SENSITIVE_PREFIXES = (".env",)
+
+    # Dangerous command patterns (compiled once, case-insensitive)
     DANGEROUS_PATTERNS = [
-        (r"\brm\s+-rf\s+/", "Recursive delete from root"),
-        (r"\brm\s+-rf\s+\*", "Recursive delete wildcard"),
-        (r"\bdd\s+if=", "Direct disk access"),
-        (r"\bmkfs", "Filesystem creation"),
-        (r"\b:\(\)\s*\{\s*:\s*\|\s*:\s*&\s*\}\s*;", "Fork bomb"),
-        (r"\bcurl\s+.*\|\s*(ba)?sh", "Pipe to shell"),
-        (r"\bwget\s+.*\|\s*(ba)?sh", "Pipe to shell"),
-        (r"\bchmod\s+777", "Overly permissive chmod"),
-        (r"\bsudo\s+", "Sudo command"),
-        (r"\b>\s*/dev/sd", "Direct device write"),
-        (r"\bnc\s+-l", "Network listener"),
-        (r"\b(python|python3|node|ruby|perl)\s+-c\s+['\"].*eval", "Code injection"),
-        (r"\beval\s+\$", "Eval with variable"),
-        (r"\bbase64\s+-d.*\|\s*(ba)?sh", "Encoded payload execution"),
+        (re.compile(pattern, re.IGNORECASE), reason)
+        for pattern, reason in [
+            (r"\brm\s+-rf\s+/", "Recursive delete from root"),
+            (r"\brm\s+-rf\s+\*", "Recursive delete wildcard"),
+            (r"\bdd\s+if=", "Direct disk access"),
+            (r"\bmkfs", "Filesystem creation"),
+            (r"\b:\(\)\s*\{\s*:\s*\|\s*:\s*&\s*\}\s*;", "Fork bomb"),
+            (r"\bcurl\s+.*\|\s*(ba)?sh", "Pipe to shell"),
+            (r"\bwget\s+.*\|\s*(ba)?sh", "Pipe to shell"),
+            (r"\bchmod\s+777", "Overly permissive chmod"),
+            (r"\bsudo\s+", "Sudo command"),
+            (r"\b>\s*/dev/sd", "Direct device write"),
+            (r"\bnc\s+-l", "Network listener"),
+            (r"\b(python|python3|node|ruby|perl)\s+-c\s+['\"].*eval", "Code injection"),
+            (r"\beval\s+\$", "Eval with variable"),
+            (r"\bbase64\s+-d.*\|\s*(ba)?sh", "Encoded payload execution"),
+        ]
     ]
+    _DANGEROUS_UNION = _union(DANGEROUS_PATTERNS, re.IGNORECASE)
 
     # Network commands
     NETWORK_COMMANDS = ["curl", "wget", "nc", "netcat", "ssh", "scp", "rsync", "ftp", "telnet"]
+    _NETWORK_RE = re.compile(r"\b(" + "|".join(NETWORK_COMMANDS) + r")\b")
 
     def __init__(self, config: SecurityConfig):
         self.config = config
@@ -100,6 +144,9 @@ class SecurityManager:
         """
         Check if path is within allowed workspace boundary.
 
+        The path is resolved on every call, since symlinks can change at
+        any time; only the string checks on the resolved parts are cached.
+
         Returns:
             Tuple of (is_valid, message)
         """
@@ -116,23 +163,41 @@ class SecurityManager:
             except ValueError:
                 return False, f"Path outside workspace: {path}"
 
-            # Check for sensitive files
-            filename = resolved.name
-            if filename in self.SENSITIVE_FILES:
-                return False, f"Access to sensitive file blocked: {filename}"
-
-            # Check parent directories for sensitive patterns
-            for part in resolved.parts:
-                if part.startswith(".env"):
-                    return False, f"Access to .env file blocked: {path}"
-                if part in (".aws", ".ssh") and len(resolved.parts) > resolved.parts.index(part) + 1:
-                    return False, f"Access to credentials directory blocked: {path}"
-
-            return True, "OK"
+            blocked = self._sensitive_part(resolved.parts)
+            if blocked is None:
+                return True, "OK"
+            kind, part = blocked
+            if kind == "file":
+                return False, f"Access to sensitive file blocked: {part}"
+            if kind == "env":
+                return False, f"Access to .env file blocked: {path}"
+            return False, f"Access to credentials directory blocked: {path}"
 
         except Exception as e:
             return False, f"Invalid path: {e}"
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sensitive_part(parts: Tuple[str, ...]) -> Optional[Tuple[str, str]]:
+        """First blocked component of resolved path parts as (kind, part), or None."""
+        # Check the filename and parent directories in one pass
+        last = len(parts) - 1
+        for i, part in enumerate(parts):
+            if i == last and part in SecurityManager.SENSITIVE_FILES:
+                return "file", part
+            if part.startswith(SecurityManager.SENSITIVE_PREFIXES):
+                return "env", part
+            if part in SecurityManager.SENSITIVE_DIRS and i < last:
+                return "dir", part
+        return None
+
+    def _may_contain_secret(self, content: str) -> bool:
+        """Substring anchor check, then one pass of the fused secret regex."""
+        folded = content.casefold()
+        if not any(anchor in folded for anchor in self._SECRET_ANCHORS):
+            return False
+        return self._SECRET_UNION.search(content) is not None
+
     def scan_for_secrets(self, content: str) -> List[Dict]:
         """
         Scan content for potential secrets.
@@ -141,19 +206,19 @@ class SecurityManager:
             List of findings with type and warning message
         """
         findings = []
+        # Cheap checks first; most scans end here with no match
+        if not self._may_contain_secret(content):
+            return findings
         for pattern, secret_type in self.SECRET_PATTERNS:
-            try:
-                matches = re.findall(pattern, content)
-                if matches:
-                    findings.append(
-                        {
-                            "type": secret_type,
-                            "count": len(matches),
-                            "warning": f"Found {len(matches)} potential {secret_type}(s)",
-                        }
-                    )
-            except re.error:
-                continue
+            matches = pattern.findall(content)
+            if matches:
+                findings.append(
+                    {
+                        "type": secret_type,
+                        "count": len(matches),
+                        "warning": f"Found {len(matches)} potential {secret_type}(s)",
+                    }
+                )
         return findings
 
     def validate_command(self, command: str) -> Tuple[bool, str]:
@@ -164,19 +229,17 @@ class SecurityManager:
             Tuple of (is_valid, message)
         """
         # Check dangerous patterns
-        for pattern, reason in self.DANGEROUS_PATTERNS:
-            try:
-                if re.search(pattern, command, re.IGNORECASE):
-                    return False, f"Blocked: {reason}"
-            except re.error:
-                continue
+        match = self._DANGEROUS_UNION.search(command)
+        if match:
+            reason = self.DANGEROUS_PATTERNS[int(match.lastgroup[1:])][1]
+            return False, f"Blocked: {reason}"
 
         # Block network commands if not allowed
         if not self.config.allow_network:
-            for cmd in self.NETWORK_COMMANDS:
-                # Match command at word boundary
-                if re.search(rf"\b{cmd}\b", command):
-                    return False, f"Network command blocked: {cmd}"
+            # Match any network command at word boundary
+            match = self._NETWORK_RE.search(command)
+            if match:
+                return False, f"Network command blocked: {match.group(1)}"
 
         return True, "OK"
 
@@ -192,11 +255,10 @@ class SecurityManager:
         if len(output) <= max_size:
             return output, False
 
-        # Truncate and add notice
-        truncated = output[:max_size]
+        # Truncate and add notice in one allocation
         omitted = len(output) - max_size
-        truncated += f"\n\n... [OUTPUT TRUNCATED - {omitted:,} bytes omitted]"
-        return truncated, True
+        notice = f"\n\n... [OUTPUT TRUNCATED - {omitted:,} bytes omitted]"
+        return "".join((output[:max_size], notice)), True
 
     def validate_file_size(self, path: str) -> Tuple[bool, str]:
         """Check if file size is within limits."""
@@ -212,18 +274,17 @@ class SecurityManager:
         except Exception as e:
             return False, f"Cannot check file size: {e}"
 
-    def hash_content(self, content: str) -> str:
-        """Generate hash for audit trail."""
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+    def hash_content(self, content: Union[str, bytes]) -> str:
+        """Generate hash for audit trail (bytes are hashed without re-encoding)."""
+        data = content.encode() if isinstance(content, str) else content
+        return hashlib.sha256(data, **_HASH_KWARGS).hexdigest()[:16]
 
     def sanitize_for_display(self, content: str, max_length: int = 100) -> str:
         """Sanitize content for safe display (redact potential secrets)."""
         sanitized = content
-        for pattern, _ in self.SECRET_PATTERNS:
-            try:
-                sanitized = re.sub(pattern, "[REDACTED]", sanitized)
-            except re.error:
-                continue
+        if self._may_contain_secret(sanitized):
+            for pattern, _ in self.SECRET_PATTERNS:
+                sanitized = pattern.sub("[REDACTED]", sanitized)
 
         if len(sanitized) > max_length:
             sanitized = sanitized[:max_length] + "..."
@@ -1,13 +1,150 @@
 """
 Semantic Search - Code search using Bedrock Titan Embeddings
 """
+import ast
 import boto3
+import hashlib
 import json
+import math
 import os
+import re
+import sqlite3
+import threading
 import numpy as np
+from collections import OrderedDict
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    import simsimd
+except ImportError:  # Optional SIMD kernels - fall back to NumPy/BLAS
+    simsimd = None
+
+
+def _scores(matrix: np.ndarray, query_vec: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a unit query against row-normalized embeddings."""
+    if simsimd is not None:
+        distances = simsimd.cdist(query_vec[np.newaxis, :], matrix, metric="cosine")
+        return 1.0 - np.asarray(distances, dtype=np.float32)[0]
+    return matrix @ query_vec
+
+
+def _quantize(x: np.ndarray) -> np.ndarray:
+    """Scale each row (or a single vector) into int8 range; angles are preserved."""
+    peak = np.abs(x).max(axis=-1, keepdims=True)
+    peak[peak == 0] = 1.0
+    return np.round(x * (127.0 / peak)).astype(np.int8)
+
+
+def _train_ivf(
+    matrix: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cluster row-normalized embeddings with spherical k-means.
+
+    Centroids are trained on a sample and every row is then assigned once.
+
+    Returns:
+        (centroids, order, offsets) where order lists row indices grouped by
+        cluster and rows of cluster c are order[offsets[c]:offsets[c + 1]]
+    """
+    rng = np.random.default_rng(seed)
+    n = len(matrix)
+    sample = matrix[np.sort(rng.choice(n, size=min(n, 64 * n_clusters), replace=False))]
+    centroids = sample[rng.choice(len(sample), size=n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(n_clusters):
+            members = sample[labels == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+
+    # Assign all rows in blocks to bound the temporary score matrix
+    labels = np.empty(n, dtype=np.int32)
+    for start in range(0, n, 8192):
+        block = np.asarray(matrix[start : start + 8192])
+        labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    order = np.argsort(labels, kind="stable").astype(np.int64)
+    offsets = np.searchsorted(labels[order], np.arange(n_clusters + 1)).astype(np.int64)
+    return centroids, order, offsets
+
+
+# Identifier-like tokens for the lexical (BM25) index
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+# Queries naming a symbol: `quoted`, snake_case, camelCase or CamelCase
+_CODE_TOKEN_RE = re.compile(r"`[^`]+`|\b\w*(?:[A-Za-z0-9]_[A-Za-z0-9]|[a-z][A-Z])\w*")
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercased identifier tokens of text."""
+    return [t.lower() for t in _TOKEN_RE.findall(text)]
+
+
+def _build_postings(contents: List[str]) -> Tuple[Dict[str, List[List[int]]], List[int]]:
+    """
+    Build an inverted index over chunk texts.
+
+    Returns:
+        (postings, lengths) where postings maps token -> [rows, term counts]
+        and lengths holds the token count of each row
+    """
+    postings: Dict[str, List[List[int]]] = {}
+    lengths = []
+    for row, content in enumerate(contents):
+        tokens = _tokens(content)
+        lengths.append(len(tokens))
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            entry = postings.get(token)
+            if entry is None:
+                postings[token] = [[row], [tf]]
+            else:
+                entry[0].append(row)
+                entry[1].append(tf)
+    return postings, lengths
+
+
+def _windows(start: int, end: int, size: int) -> List[Tuple[int, int]]:
+    """Fixed-size (start, end) line spans covering [start, end)."""
+    return [(i, min(i + size, end)) for i in range(start, end, size)]
+
+
+# Query embeddings shared across instances (the search tool builds one per call)
+_QUERY_CACHE_SIZE = 512
+_query_cache: "OrderedDict[Tuple[str, str, str], List[float]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+# One bedrock-runtime client per region; boto3 clients are thread-safe and
+# reusing one keeps its pooled keep-alive connections warm
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(region: str):
+    """Shared bedrock-runtime client for region."""
+    with _clients_lock:
+        client = _clients.get(region)
+        if client is None:
+            client = boto3.client(
+                "bedrock-runtime",
+                region_name=region,
+                config=Config(
+                    max_pool_connections=64,
+                    retries={"max_attempts": 8, "mode": "adaptive"},
+                    tcp_keepalive=True,
+                ),
+            )
+            _clients[region] = client
+        return client
+
 
 @dataclass
 class CodeChunk:
@@ -16,13 +153,41 @@ class CodeChunk:
     file_path: str
     start_line: int
     end_line: int
-    content: str
+    content: Optional[str]  # None once indexed; see SemanticSearch._load_content
     embedding: Optional[List[float]] = None
+    meta_offset: Optional[int] = None  # Byte offset of this chunk's line in meta.jsonl
 
 
 class SemanticSearch:
     """Semantic code search using Bedrock Titan Embeddings."""
 
+    # Concurrent Titan requests while indexing
+    EMBED_WORKERS = 16
+
+    # Cluster the index (IVF) once it is large enough that a full scan dominates
+    IVF_MIN_CHUNKS = 20000
+    IVF_PROBES = 8
+
+    # Hybrid search for symbol-like queries: add the best BM25 rows for the
+    # query's identifiers to the dense candidates and blend the two scores
+    LEXICAL_CANDIDATES = 500
+    LEXICAL_WEIGHT = 0.3
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+
+    # Two-stage scoring: shortlist on a leading-dimension prefix of the
+    # (Matryoshka-trained) Titan v2 vectors, then rerank at full width
+    SHORTLIST_MIN_ROWS = 5000
+    SHORTLIST_DIMS = 256
+    SHORTLIST_SIZE = 100
+    EMBED_CACHE_FILENAME = "embed_cache.sqlite"
+    # Index files: embedding matrix plus one metadata line per row
+    MATRIX_FILENAME = "emb.npy"
+    META_FILENAME = "meta.jsonl"
+    IVF_FILENAME = "ivf.npz"
+    LEXICAL_FILENAME = "lexical.json"
+    LEGACY_FILENAME = "chunks.json"
+
     def __init__(self, region: str = "ap-southeast-2", index_path: str = "./.code_index"):
         """
         Initialize semantic search.
@@ -33,9 +198,19 @@ class SemanticSearch:
         """
         self.region = region
         self.index_path = index_path
-        self.client = boto3.client("bedrock-runtime", region_name=region)
+        self.client = _get_client(region)
         self.model_id = "amazon.titan-embed-text-v2:0"
         self.chunks: List[CodeChunk] = []
+        # Row-normalized float32 embeddings, one row per chunk
+        self._emb_matrix: Optional[np.ndarray] = None
+        # int8 copy for SimSIMD and normalized prefix copy, built on first search
+        self._emb_i8: Optional[np.ndarray] = None
+        self._emb_short: Optional[np.ndarray] = None
+        # Optional IVF layer: (centroids, order, offsets) from _train_ivf
+        self._ivf: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        # Optional BM25 layer: (postings, lengths) from _build_postings
+        self._lexical: Optional[Tuple[Dict[str, List[List[int]]], np.ndarray]] = None
+        self._cache_conn: Optional[sqlite3.Connection] = None
 
     def _get_embedding(self, text: str) -> List[float]:
         """
@@ -58,11 +233,48 @@ class SemanticSearch:
         result = json.loads(response["body"].read())
         return result["embedding"]
 
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        a_arr = np.array(a)
-        b_arr = np.array(b)
-        return float(np.dot(a_arr, b_arr) / (np.linalg.norm(a_arr) * np.linalg.norm(b_arr)))
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a search query, reusing recent results for repeated queries."""
+        key = (self.region, self.model_id, query)
+        with _query_cache_lock:
+            embedding = _query_cache.get(key)
+            if embedding is not None:
+                _query_cache.move_to_end(key)
+                return embedding
+
+        embedding = self._get_embedding(query)
+        with _query_cache_lock:
+            _query_cache[key] = embedding
+            if len(_query_cache) > _QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+        return embedding
+
+    @staticmethod
+    def clear_query_cache():
+        """Forget cached query embeddings."""
+        with _query_cache_lock:
+            _query_cache.clear()
+
+    def _build_matrix(self):
+        """
+        Stack chunk embeddings into a row-normalized float32 matrix.
+
+        The per-chunk embedding lists are released afterwards; the matrix
+        is the only copy kept.
+        """
+        self.chunks = [c for c in self.chunks if c.embedding]
+        if not self.chunks:
+            self._set_matrix(None)
+            return
+        matrix = np.asarray([c.embedding for c in self.chunks], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        self._set_matrix(matrix)
+        postings, lengths = _build_postings([c.content or "" for c in self.chunks])
+        self._lexical = (postings, np.asarray(lengths, dtype=np.float32))
+        for chunk in self.chunks:
+            chunk.embedding = None
 
     def index_codebase(
         self,
@@ -82,87 +294,379 @@ class SemanticSearch:
             Number of chunks indexed
         """
         extensions = extensions or [".py", ".js", ".ts", ".tsx", ".java", ".go", ".rs", ".c", ".cpp", ".h"]
-        self.chunks = []
+        filepaths = self._find_source_files(root_dir, tuple(extensions))
+
+        # Read and chunk files in parallel (I/O releases the GIL); map keeps file order
+        pending: List[CodeChunk] = []
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            for file_chunks in pool.map(lambda path: self._chunk_file(path, chunk_size), filepaths):
+                pending.extend(file_chunks)
+
+        # Reuse cached embeddings for unchanged content
+        hashes = [self._content_hash(c.content) for c in pending]
+        cached = self._get_cached_embeddings(hashes)
+        misses = [(h, c) for h, c in zip(hashes, pending) if h not in cached]
+
+        # Embed the rest concurrently; requests are network-bound
+        with ThreadPoolExecutor(max_workers=self.EMBED_WORKERS) as pool:
+            fresh = list(pool.map(self._try_embed, [c for _, c in misses]))
+        new_entries = {h: e for (h, _), e in zip(misses, fresh) if e is not None}
+        self._store_cached_embeddings(new_entries)
+        cached.update(new_entries)
 
-        for dirpath, dirnames, filenames in os.walk(root_dir):
-            # Skip hidden directories
-            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-
-            for filename in filenames:
-                if not any(filename.endswith(ext) for ext in extensions):
-                    continue
-
-                filepath = os.path.join(dirpath, filename)
-                self._index_file(filepath, chunk_size)
+        self.chunks = []
+        for chunk, content_hash in zip(pending, hashes):
+            embedding = cached.get(content_hash)
+            if embedding is not None:
+                chunk.embedding = embedding
+                self.chunks.append(chunk)
 
         # Save index
+        self._build_matrix()
+        if len(self.chunks) >= self.IVF_MIN_CHUNKS:
+            self._ivf = _train_ivf(self._emb_matrix, int(np.sqrt(len(self.chunks))))
         self._save_index()
+        self._release_content()
         return len(self.chunks)
 
-    def _index_file(self, filepath: str, chunk_size: int = 50):
+    @staticmethod
+    def _find_source_files(root_dir: str, extensions: Tuple[str, ...]) -> List[str]:
         """
-        Split file into chunks and index each.
+        Walk root_dir with os.scandir, skipping hidden directories.
+
+        Uses the cached d_type from scandir, so unmatched files cost no stat.
+        """
+        found = []
+        stack = [root_dir]
+        while stack:
+            dirpath = stack.pop()
+            try:
+                with os.scandir(dirpath) as it:
+                    subdirs = []
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith("."):
+                                subdirs.append(entry.path)
+                        elif entry.name.endswith(extensions):
+                            found.append(entry.path)
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
+        return found
+
+    def _chunk_file(self, filepath: str, chunk_size: int = 50) -> List[CodeChunk]:
+        """
+        Split file into chunks (without embeddings).
 
         Args:
             filepath: Path to file
-            chunk_size: Lines per chunk
+            chunk_size: Lines per chunk (upper bound for Python files)
+
+        Returns:
+            List of chunks
         """
         try:
             with open(filepath, "r", encoding="utf-8", errors="replace") as f:
                 lines = f.readlines()
         except IOError:
-            return
+            return []
+
+        spans = None
+        if filepath.endswith(".py"):
+            spans = self._python_spans(lines, chunk_size)
+        if spans is None:
+            spans = _windows(0, len(lines), chunk_size)
+
+        chunks = []
 
         # Split into chunks
-        for i in range(0, len(lines), chunk_size):
-            chunk_lines = lines[i : i + chunk_size]
+        for start, end in spans:
+            chunk_lines = lines[start:end]
             content = "".join(chunk_lines)
 
             # Skip tiny chunks
             if len(content.strip()) < 50:
                 continue
 
-            chunk = CodeChunk(
-                file_path=filepath,
-                start_line=i + 1,
-                end_line=i + len(chunk_lines),
-                content=content,
+            chunks.append(
+                CodeChunk(
+                    file_path=filepath,
+                    start_line=start + 1,
+                    end_line=end,
+                    content=content,
+                )
+            )
+        return chunks
+
+    @staticmethod
+    def _python_spans(lines: List[str], chunk_size: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        Chunk boundaries for Python source aligned to top-level defs/classes.
+
+        Adjacent definitions are packed together up to chunk_size lines; long
+        classes are split at their methods and only single definitions longer
+        than chunk_size are cut into windows.
+
+        Returns:
+            List of (start, end) 0-based line spans, or None if unparseable
+        """
+        try:
+            tree = ast.parse("".join(lines))
+        except (SyntaxError, ValueError):
+            return None
+
+        defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        units: List[Tuple[int, int]] = []
+
+        def collect(body, pos: int, end: int):
+            # Split [pos, end) into definition units and the code between them
+            for node in body:
+                if not isinstance(node, defs):
+                    continue
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+                if start > pos:
+                    units.append((pos, start))
+                if isinstance(node, ast.ClassDef) and node.end_lineno - start > chunk_size:
+                    # Long classes are split at method boundaries
+                    collect(node.body, start, node.end_lineno)
+                else:
+                    units.append((start, node.end_lineno))
+                pos = node.end_lineno
+            if pos < end:
+                units.append((pos, end))
+
+        collect(tree.body, 0, len(lines))
+
+        spans: List[Tuple[int, int]] = []
+        current = None
+        for start, end in units:
+            if end - start > chunk_size:
+                if current:
+                    spans.append(current)
+                    current = None
+                spans.extend(_windows(start, end, chunk_size))
+            elif current and end - current[0] <= chunk_size:
+                current = (current[0], end)
+            else:
+                if current:
+                    spans.append(current)
+                current = (start, end)
+        if current:
+            spans.append(current)
+        return spans
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Cache key for a chunk's content."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _get_cache_db(self) -> sqlite3.Connection:
+        """Open the embedding cache (content hash + model -> float32 vector)."""
+        if self._cache_conn is None:
+            os.makedirs(self.index_path, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.index_path, self.EMBED_CACHE_FILENAME))
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(hash TEXT, model TEXT, vec BLOB, PRIMARY KEY (hash, model))"
+            )
+            conn.commit()
+            self._cache_conn = conn
+        return self._cache_conn
+
+    def _get_cached_embeddings(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up cached embeddings for the given content hashes."""
+        conn = self._get_cache_db()
+        found: Dict[str, List[float]] = {}
+        unique = list(set(hashes))
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            batch = unique[i : i + 500]
+            rows = conn.execute(
+                f"SELECT hash, vec FROM cache WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                (self.model_id, *batch),
             )
+            for content_hash, vec in rows:
+                found[content_hash] = np.frombuffer(vec, dtype=np.float32).tolist()
+        return found
+
+    def _store_cached_embeddings(self, entries: Dict[str, List[float]]):
+        """Write new embeddings to the cache in one transaction."""
+        if not entries:
+            return
+        conn = self._get_cache_db()
+        conn.executemany(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (
+                (h, self.model_id, np.asarray(e, dtype=np.float32).tobytes())
+                for h, e in entries.items()
+            ),
+        )
+        conn.commit()
+
+    def _try_embed(self, chunk: CodeChunk) -> Optional[List[float]]:
+        """Embed a chunk, returning None (with a warning) on failure."""
+        try:
+            return self._get_embedding(chunk.content)
+        except Exception as e:
+            print(f"Warning: Failed to embed {chunk.file_path}: {e}")
+            return None
+
+    def _set_matrix(self, matrix: Optional[np.ndarray]):
+        """Install a new embedding matrix and drop derived copies."""
+        self._emb_matrix = matrix
+        self._emb_i8 = None
+        self._emb_short = None
+        self._ivf = None
+        self._lexical = None
+
+    def _release_content(self):
+        """Drop chunk text from memory; hits re-read it from the index sidecar."""
+        for chunk in self.chunks:
+            chunk.content = None
+
+    def _load_content(self, chunk: CodeChunk) -> str:
+        """
+        Return a chunk's text as indexed, reading it back from meta.jsonl if released.
 
-            # Get embedding
+        Chunks without a sidecar entry (legacy indexes) fall back to their
+        line range in the source file.
+        """
+        if chunk.content is not None:
+            return chunk.content
+        if chunk.meta_offset is not None:
             try:
-                chunk.embedding = self._get_embedding(content)
-                self.chunks.append(chunk)
-            except Exception as e:
-                print(f"Warning: Failed to embed {filepath}: {e}")
+                with open(os.path.join(self.index_path, self.META_FILENAME), "rb") as f:
+                    f.seek(chunk.meta_offset)
+                    meta = json.loads(f.readline())
+                # The sidecar may have been rewritten by another indexer since
+                if (meta["file_path"], meta["start_line"]) == (chunk.file_path, chunk.start_line):
+                    return meta["content"]
+            except (OSError, ValueError, KeyError):
+                pass
+        try:
+            with open(chunk.file_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except IOError:
+            return "(source file unavailable)"
+        return "".join(lines[chunk.start_line - 1 : chunk.end_line])
 
     def _save_index(self):
-        """Save index to disk."""
+        """Save index to disk (embedding matrix + metadata sidecar)."""
         os.makedirs(self.index_path, exist_ok=True)
 
-        data = []
-        for chunk in self.chunks:
-            data.append(
-                {
+        matrix = self._emb_matrix
+        if matrix is None:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        # Write to temp files and swap in, so existing memory maps stay valid
+        matrix_path = os.path.join(self.index_path, self.MATRIX_FILENAME)
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, matrix)
+        meta_path = os.path.join(self.index_path, self.META_FILENAME)
+        offsets = []
+        with open(meta_path + ".tmp", "wb") as f:
+            for chunk in self.chunks:
+                meta = {
                     "file_path": chunk.file_path,
                     "start_line": chunk.start_line,
                     "end_line": chunk.end_line,
                     "content": chunk.content,
-                    "embedding": chunk.embedding,
                 }
-            )
-
-        with open(os.path.join(self.index_path, "chunks.json"), "w") as f:
-            json.dump(data, f)
+                offsets.append(f.tell())
+                f.write((json.dumps(meta) + "\n").encode("utf-8"))
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(meta_path + ".tmp", meta_path)
+        for chunk, offset in zip(self.chunks, offsets):
+            chunk.meta_offset = offset
+
+        ivf_path = os.path.join(self.index_path, self.IVF_FILENAME)
+        if self._ivf is not None:
+            centroids, order, offsets = self._ivf
+            with open(ivf_path + ".tmp", "wb") as f:
+                np.savez(f, centroids=centroids, order=order, offsets=offsets)
+            os.replace(ivf_path + ".tmp", ivf_path)
+        elif os.path.exists(ivf_path):
+            os.remove(ivf_path)
+
+        lexical_path = os.path.join(self.index_path, self.LEXICAL_FILENAME)
+        if self._lexical is not None:
+            postings, lengths = self._lexical
+            with open(lexical_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"lengths": lengths.astype(int).tolist(), "postings": postings}, f)
+            os.replace(lexical_path + ".tmp", lexical_path)
+        elif os.path.exists(lexical_path):
+            os.remove(lexical_path)
+
+        # Superseded by the files above
+        legacy = os.path.join(self.index_path, self.LEGACY_FILENAME)
+        if os.path.exists(legacy):
+            os.remove(legacy)
 
     def _load_index(self) -> bool:
         """
         Load index from disk.
 
+        The embedding matrix is memory-mapped rather than read into memory.
+
         Returns:
             True if loaded successfully
         """
-        path = os.path.join(self.index_path, "chunks.json")
+        matrix_path = os.path.join(self.index_path, self.MATRIX_FILENAME)
+        meta_path = os.path.join(self.index_path, self.META_FILENAME)
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return self._load_legacy_index()
+
+        try:
+            # Chunk text stays in the sidecar; only its offset is kept for hits
+            chunks = []
+            with open(meta_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    chunk = CodeChunk(**json.loads(line))
+                    chunk.content = None
+                    chunk.meta_offset = offset
+                    chunks.append(chunk)
+                    offset += len(line)
+            matrix = np.load(matrix_path, mmap_mode="r")
+        except (ValueError, TypeError, OSError):
+            return False
+        if len(chunks) != len(matrix):
+            return False
+
+        self.chunks = chunks
+        self._set_matrix(matrix if chunks else None)
+        self._ivf = self._load_ivf(len(chunks))
+        self._lexical = self._load_lexical(len(chunks))
+        return True
+
+    def _load_ivf(self, n_rows: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Load the IVF layer if present and consistent with the matrix."""
+        path = os.path.join(self.index_path, self.IVF_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                ivf = (data["centroids"], data["order"], data["offsets"])
+        except (ValueError, KeyError, OSError):
+            return None
+        return ivf if len(ivf[1]) == n_rows else None
+
+    def _load_lexical(self, n_rows: int) -> Optional[Tuple[Dict[str, List[List[int]]], np.ndarray]]:
+        """Load the BM25 postings if present and consistent with the matrix."""
+        path = os.path.join(self.index_path, self.LEXICAL_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            lexical = (data["postings"], np.asarray(data["lengths"], dtype=np.float32))
+        except (ValueError, KeyError, OSError):
+            return None
+        return lexical if len(lexical[1]) == n_rows else None
+
+    def _load_legacy_index(self) -> bool:
+        """Load an index saved as a single chunks.json with inline embeddings."""
+        path = os.path.join(self.index_path, self.LEGACY_FILENAME)
         if not os.path.exists(path):
             return False
 
@@ -171,6 +675,8 @@ class SemanticSearch:
                 data = json.load(f)
 
             self.chunks = [CodeChunk(**d) for d in data]
+            self._build_matrix()
+            self._release_content()
             return True
         except (json.JSONDecodeError, TypeError):
             return False
@@ -190,19 +696,121 @@ class SemanticSearch:
             if not self._load_index():
                 return []
 
-        # Get query embedding
-        query_embedding = self._get_embedding(query)
-
-        # Calculate similarities
-        results = []
-        for chunk in self.chunks:
-            if chunk.embedding:
-                sim = self._cosine_similarity(query_embedding, chunk.embedding)
-                results.append((chunk, sim))
+        if self._emb_matrix is None:
+            return []
+
+        # Unit query vector; cosine similarity is then one matrix-vector product
+        query_vec = np.asarray(self._embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm:
+            query_vec /= norm
+        rows = self._ivf_candidates(query_vec, top_k)
+        rows = self._shortlist(query_vec, rows, top_k)
+        lex_rows, lexical = self._lexical_candidates(query)
+        if lex_rows is not None and rows is not None:
+            # Lexical hits are scored alongside the dense shortlist, never instead of it
+            rows = np.union1d(rows, lex_rows)
+        sims = self._score_rows(query_vec, rows)
+        if lex_rows is not None:
+            at = lex_rows if rows is None else np.searchsorted(rows, lex_rows)
+            sims = (1.0 - self.LEXICAL_WEIGHT) * sims
+            sims[at] += self.LEXICAL_WEIGHT * lexical
+
+        # Top-k without a full sort
+        top_k = min(top_k, len(sims))
+        if top_k <= 0:
+            return []
+        idx = np.argpartition(-sims, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-sims[idx])]
+        chunk_idx = idx if rows is None else rows[idx]
+        return [(self.chunks[c], float(sims[i])) for c, i in zip(chunk_idx, idx)]
+
+    def _lexical_candidates(self, query: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Best BM25 rows for queries that name a symbol.
 
-        # Sort by similarity
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+        Returns:
+            (sorted rows, normalized BM25 scores of those rows), or
+            (None, None) when the query is not symbol-like or matches nothing
+        """
+        if self._lexical is None:
+            return None, None
+        # Only the symbol-like parts of the query select lexical candidates
+        code_terms = _CODE_TOKEN_RE.findall(query)
+        if not code_terms:
+            return None, None
+        postings, lengths = self._lexical
+        n = len(lengths)
+        avg_len = float(lengths.mean()) or 1.0
+        k1, b = self.BM25_K1, self.BM25_B
+
+        # Accumulate only over the posting lists of the query tokens
+        scores: Dict[int, float] = {}
+        for token in set(_tokens(" ".join(code_terms))):
+            entry = postings.get(token)
+            if not entry:
+                continue
+            rows = np.asarray(entry[0], dtype=np.int64)
+            tf = np.asarray(entry[1], dtype=np.float32)
+            idf = math.log(1.0 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            gains = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[rows] / avg_len))
+            for row, gain in zip(rows.tolist(), gains.tolist()):
+                scores[row] = scores.get(row, 0.0) + gain
+        if not scores:
+            return None, None
+
+        rows = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+        bm25 = np.fromiter(scores.values(), dtype=np.float32, count=len(scores))
+        if len(rows) > self.LEXICAL_CANDIDATES:
+            best = np.argpartition(-bm25, self.LEXICAL_CANDIDATES - 1)[: self.LEXICAL_CANDIDATES]
+            rows, bm25 = rows[best], bm25[best]
+        order = np.argsort(rows)
+        return rows[order], bm25[order] / (bm25.max() or 1.0)
+
+    def _ivf_candidates(self, query_vec: np.ndarray, top_k: int) -> Optional[np.ndarray]:
+        """Rows in the clusters nearest the query, or None to scan everything."""
+        if self._ivf is None:
+            return None
+        centroids, order, offsets = self._ivf
+        n_probe = min(self.IVF_PROBES, len(centroids))
+        probes = np.argpartition(-(centroids @ query_vec), n_probe - 1)[:n_probe]
+        rows = np.concatenate([order[offsets[c] : offsets[c + 1]] for c in probes])
+        return rows if len(rows) >= top_k else None
+
+    def _shortlist(
+        self, query_vec: np.ndarray, rows: Optional[np.ndarray], top_k: int
+    ) -> Optional[np.ndarray]:
+        """Narrow candidate rows using only the leading embedding dimensions."""
+        n_rows = len(self._emb_matrix) if rows is None else len(rows)
+        size = max(self.SHORTLIST_SIZE, top_k)
+        dims = self.SHORTLIST_DIMS
+        if n_rows < self.SHORTLIST_MIN_ROWS or n_rows <= size or self._emb_matrix.shape[1] <= dims:
+            return rows
+
+        if self._emb_short is None:
+            short = np.array(self._emb_matrix[:, :dims], dtype=np.float32)
+            norms = np.linalg.norm(short, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._emb_short = short / norms
+        query_short = query_vec[:dims] / (np.linalg.norm(query_vec[:dims]) or 1.0)
+
+        matrix = self._emb_short if rows is None else self._emb_short[rows]
+        sims = _scores(matrix, query_short)
+        best = np.argpartition(-sims, size - 1)[:size]
+        return best if rows is None else rows[best]
+
+    def _score_rows(self, query_vec: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Similarity of the unit query to the given rows (all rows if None)."""
+        if simsimd is not None:
+            # int8 cosine reads a quarter of the bytes with near-identical ranking
+            if self._emb_i8 is None:
+                self._emb_i8 = _quantize(self._emb_matrix)
+            matrix, query = self._emb_i8, _quantize(query_vec)
+        else:
+            matrix, query = self._emb_matrix, query_vec
+        if rows is not None:
+            matrix = matrix[rows]
+        return _scores(matrix, query)
 
     def format_results(self, results: List[Tuple[CodeChunk, float]]) -> str:
         """
@@ -224,8 +832,9 @@ class SemanticSearch:
             )
             output.append("```")
             # Truncate long content
-            content = chunk.content[:500]
-            if len(chunk.content) > 500:
+            full = self._load_content(chunk)
+            content = full[:500]
+            if len(full) > 500:
                 content += "\n... (truncated)"
             output.append(content)
             output.append("```")
@@ -234,8 +843,10 @@ class SemanticSearch:
 
     def is_indexed(self) -> bool:
         """Check if codebase is indexed."""
-        path = os.path.join(self.index_path, "chunks.json")
-        return os.path.exists(path)
+        return any(
+            os.path.exists(os.path.join(self.index_path, name))
+            for name in (self.META_FILENAME, self.LEGACY_FILENAME)
+        )
 
     def get_index_stats(self) -> Dict:
         """Get statistics about the index."""
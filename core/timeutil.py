@@ -0,0 +1,27 @@
+"""
+Time helpers - cheap ISO timestamps for hot logging/persistence paths
+"""
+import time
+from datetime import datetime
+from typing import Tuple
+
+# (epoch second, ISO string for that second) - swapped as one tuple so
+# concurrent readers never see a mismatched pair
+_cached_second: Tuple[int, str] = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Current local time in ISO format with microseconds.
+
+    The datetime is only formatted once per wall-clock second; within the
+    same second only the microsecond suffix is recomputed.
+    """
+    global _cached_second
+    t = time.time()
+    sec = int(t)
+    cached_sec, prefix = _cached_second
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec).isoformat()
+        _cached_second = (sec, prefix)
+    return f"{prefix}.{int((t - sec) * 1_000_000):06d}"
@@ -1,8 +1,55 @@
 """
 Tool System - Tool registry and execution context
 """
+import os
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Any, List, Optional, Set
+from typing import Callable, Dict, Any, FrozenSet, List, Optional, Set, Tuple
+
+
+# Message keywords -> tools they make relevant (substring match)
+_KEYWORD_GROUPS: List[Tuple[List[str], Tuple[str, ...]]] = [
+    # File operations
+    (["write", "create", "make", "add"], ("write_file", "edit_file")),
+    (["edit", "change", "modify", "update", "fix"], ("edit_file", "read_file")),
+    # Search
+    (["search", "find", "look", "where", "grep"], ("grep", "glob")),
+    (["list", "show", "dir", "folder", "files"], ("glob", "list_dir")),
+    # Execution
+    (["run", "execute", "bash", "git", "npm", "pip", "test"], ("bash",)),
+    (["python", "script", "code"], ("python_exec",)),
+    # Documents
+    (["word", "docx", "document"], ("create_word",)),
+    (["excel", "xlsx", "spreadsheet"], ("create_excel",)),
+    (["markdown", ".md", "readme"], ("create_markdown",)),
+    # Vision
+    (["image", "picture", "screenshot", "png", "jpg"], ("view_image",)),
+    # Semantic search
+    (["semantic", "meaning", "concept"], ("semantic_search",)),
+]
+
+def _build_keyword_tools() -> Dict[str, Set[str]]:
+    """Map each keyword to its tools."""
+    keyword_tools: Dict[str, Set[str]] = {}
+    for words, tools in _KEYWORD_GROUPS:
+        for word in words:
+            keyword_tools.setdefault(word, set()).update(tools)
+    # Only the longest keyword matches at a position, so it also carries the
+    # tools of any keyword that is a prefix of it
+    for word, tools in keyword_tools.items():
+        for other in keyword_tools:
+            if other != word and word.startswith(other):
+                tools.update(keyword_tools[other])
+    return keyword_tools
+
+
+_KEYWORD_TOOLS = _build_keyword_tools()
+
+# Zero-width lookahead so overlapping keywords all match
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(w) for w in sorted(_KEYWORD_TOOLS, key=len, reverse=True)) + "))"
+)
 
 
 @dataclass
@@ -26,14 +73,65 @@ class ToolContext:
     security_manager: Any = None
     permission_manager: Any = None
     audit_logger: Any = None
+    # Memoized path -> interned realpath, so aliases of a file share one key
+    _path_keys: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    # (st_dev, st_ino) of read files, for aliases realpath can't see
+    # (hard links, case-insensitive filesystems)
+    _read_ids: Set[Tuple[int, int]] = field(default_factory=set, init=False, repr=False)
 
-    def mark_file_read(self, path: str):
-        """Mark a file as having been read."""
-        self.files_read.add(path)
+    def resolve_path(self, path: str) -> str:
+        """
+        Resolve a tool path argument against working_dir.
+
+        Same result as the usual isabs/join pair; on POSIX it is a prefix
+        check and one concatenation instead of os.path's re-parsing.
+        """
+        if os.sep != "/" or os.altsep:
+            return os.path.join(self.working_dir, path)
+        if path.startswith("/"):
+            return path
+        wd = self.working_dir
+        if not wd or wd.endswith("/"):
+            return wd + path
+        return wd + "/" + path
+
+    def _path_key(self, path: str) -> str:
+        """Canonical key for a path in files_read."""
+        key = self._path_keys.get(path)
+        if key is None:
+            key = self._path_keys[path] = sys.intern(os.path.realpath(path))
+        return key
+
+    def mark_file_read(self, path: str, st: Optional[os.stat_result] = None):
+        """
+        Mark a file as having been read.
+
+        Args:
+            path: File path
+            st: Stat of the file as read, if the caller already has one
+        """
+        key = self._path_key(path)
+        self.files_read.add(key)
+        if st is None:
+            try:
+                st = os.stat(key)
+            except OSError:
+                return
+        self._read_ids.add((st.st_dev, st.st_ino))
 
     def was_file_read(self, path: str) -> bool:
         """Check if file was previously read."""
-        return path in self.files_read
+        key = self._path_key(path)
+        if key in self.files_read:
+            return True
+        # Only a miss costs a stat
+        if not self._read_ids:
+            return False
+        try:
+            st = os.stat(key)
+        except OSError:
+            return False
+        return (st.st_dev, st.st_ino) in self._read_ids
 
 
 class ToolRegistry:
@@ -41,10 +139,16 @@ class ToolRegistry:
 
     def __init__(self):
         self.tools: Dict[str, Tool] = {}
+        # Bumped on every registration so callers can cache definitions
+        self.version = 0
+        # Definitions per subset, valid for _definitions_version
+        self._definitions: Dict[Optional[FrozenSet[str]], List[Dict]] = {}
+        self._definitions_version = 0
 
     def register(self, tool: Tool):
         """Register a tool."""
         self.tools[tool.name] = tool
+        self.version += 1
 
     def register_all(self, tools: List[Tool]):
         """Register multiple tools."""
@@ -59,24 +163,36 @@ class ToolRegistry:
         """
         Get tool definitions for Bedrock API.
 
+        Results are cached per subset until the next registration; the
+        returned list is shared and must not be mutated.
+
         Args:
             subset: Optional list of tool names to include. If None, returns all.
 
         Returns:
             List of tool definitions in Bedrock format
         """
-        tools_to_include = self.tools.values()
-        if subset:
-            tools_to_include = [t for t in self.tools.values() if t.name in subset]
-
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description,
-                "input_schema": tool.parameters,
-            }
-            for tool in tools_to_include
-        ]
+        if self._definitions_version != self.version:
+            self._definitions.clear()
+            self._definitions_version = self.version
+
+        key = frozenset(subset) if subset else None
+        definitions = self._definitions.get(key)
+        if definitions is None:
+            tools_to_include = self.tools.values()
+            if key is not None:
+                tools_to_include = [t for t in self.tools.values() if t.name in key]
+
+            definitions = [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "input_schema": tool.parameters,
+                }
+                for tool in tools_to_include
+            ]
+            self._definitions[key] = definitions
+        return definitions
 
     def select_tools_for_message(self, message: str) -> List[str]:
         """
@@ -90,53 +206,12 @@ class ToolRegistry:
         Returns:
             List of tool names to include
         """
-        msg_lower = message.lower()
-
         # Always include core tools
         selected = {"read_file", "todo_write", "todo_read"}
 
-        # File operations
-        if any(w in msg_lower for w in ["write", "create", "make", "add"]):
-            selected.add("write_file")
-            selected.add("edit_file")
-
-        if any(w in msg_lower for w in ["edit", "change", "modify", "update", "fix"]):
-            selected.add("edit_file")
-            selected.add("read_file")
-
-        # Search
-        if any(w in msg_lower for w in ["search", "find", "look", "where", "grep"]):
-            selected.add("grep")
-            selected.add("glob")
-
-        if any(w in msg_lower for w in ["list", "show", "dir", "folder", "files"]):
-            selected.add("glob")
-            selected.add("list_dir")
-
-        # Execution
-        if any(w in msg_lower for w in ["run", "execute", "bash", "git", "npm", "pip", "test"]):
-            selected.add("bash")
-
-        if any(w in msg_lower for w in ["python", "script", "code"]):
-            selected.add("python_exec")
-
-        # Documents
-        if any(w in msg_lower for w in ["word", "docx", "document"]):
-            selected.add("create_word")
-
-        if any(w in msg_lower for w in ["excel", "xlsx", "spreadsheet"]):
-            selected.add("create_excel")
-
-        if any(w in msg_lower for w in ["markdown", ".md", "readme"]):
-            selected.add("create_markdown")
-
-        # Vision
-        if any(w in msg_lower for w in ["image", "picture", "screenshot", "png", "jpg"]):
-            selected.add("view_image")
-
-        # Semantic search
-        if any(w in msg_lower for w in ["semantic", "meaning", "concept"]):
-            selected.add("semantic_search")
+        # One scan finds every keyword occurrence (overlaps included)
+        for match in _KEYWORD_RE.finditer(message.lower()):
+            selected.update(_KEYWORD_TOOLS[match.group(1)])
 
         return list(selected)
 
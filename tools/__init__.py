@@ -1,37 +1,72 @@
 """
 SageMaker Coding Agent - Tools Module
+
+Tool definitions are resolved lazily (PEP 562): a tool module is imported
+the first time one of its names is accessed. Set AGENT_EAGER_IMPORT=1 to
+resolve everything at import time instead.
 """
-from .file_ops import READ_FILE, WRITE_FILE, EDIT_FILE, GLOB, LIST_DIR
-from .search import GREP, SEMANTIC_SEARCH
-from .bash import BASH
-from .python_exec import PYTHON_EXEC
-from .document import CREATE_WORD, CREATE_EXCEL, CREATE_MARKDOWN
-from .vision import VIEW_IMAGE
-from .todo import TODO_WRITE, TODO_READ
-
-# All available tools
-ALL_TOOLS = [
+import importlib
+import os
+
+# Exported name -> defining submodule
+_LAZY = {
+    "READ_FILE": ".file_ops",
+    "WRITE_FILE": ".file_ops",
+    "EDIT_FILE": ".file_ops",
+    "GLOB": ".file_ops",
+    "LIST_DIR": ".file_ops",
+    "GREP": ".search",
+    "SEMANTIC_SEARCH": ".search",
+    "BASH": ".bash",
+    "PYTHON_EXEC": ".python_exec",
+    "CREATE_WORD": ".document",
+    "CREATE_EXCEL": ".document",
+    "CREATE_MARKDOWN": ".document",
+    "VIEW_IMAGE": ".vision",
+    "TODO_WRITE": ".todo",
+    "TODO_READ": ".todo",
+}
+
+# Order of ALL_TOOLS
+_ORDER = [
     # Read-only tools (no approval needed)
-    READ_FILE,
-    GLOB,
-    GREP,
-    LIST_DIR,
-    VIEW_IMAGE,
-    TODO_READ,
-    SEMANTIC_SEARCH,
+    "READ_FILE",
+    "GLOB",
+    "GREP",
+    "LIST_DIR",
+    "VIEW_IMAGE",
+    "TODO_READ",
+    "SEMANTIC_SEARCH",
     # Write tools (approval required)
-    WRITE_FILE,
-    EDIT_FILE,
-    CREATE_MARKDOWN,
+    "WRITE_FILE",
+    "EDIT_FILE",
+    "CREATE_MARKDOWN",
     # High-risk tools (always ask)
-    BASH,
-    PYTHON_EXEC,
-    CREATE_WORD,
-    CREATE_EXCEL,
+    "BASH",
+    "PYTHON_EXEC",
+    "CREATE_WORD",
+    "CREATE_EXCEL",
     # Task management
-    TODO_WRITE,
+    "TODO_WRITE",
 ]
 
+
+def __getattr__(name):
+    if name == "ALL_TOOLS":
+        # All available tools
+        value = [__getattr__(n) for n in _ORDER]
+    elif name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
 __all__ = [
     "READ_FILE",
     "WRITE_FILE",
@@ -50,3 +85,6 @@ __all__ = [
     "TODO_READ",
     "ALL_TOOLS",
 ]
+
+if os.environ.get("AGENT_EAGER_IMPORT") == "1":
+    __getattr__("ALL_TOOLS")
@@ -1,10 +1,13 @@
 """
 Bash Tool - Shell command execution with security controls
 """
+import asyncio
 import subprocess
 import os
+import shlex
+import shutil
 import signal
-from typing import Optional
+from typing import List, Optional, Tuple
 
 # Lazy import
 Tool = None
@@ -18,8 +21,64 @@ def _get_tool_class():
     return Tool
 
 
-def execute_bash(args: dict, ctx) -> str:
-    """Execute shell command with security controls."""
+def format_process_output(stdout: str, stderr: str, returncode: int) -> str:
+    """Combine captured streams and exit status into tool output."""
+    output = stdout
+    if stderr:
+        if output:
+            output += "\n"
+        output += f"[stderr]\n{stderr}"
+
+    if returncode != 0:
+        output += f"\n[exit code: {returncode}]"
+
+    # Truncate long output (security manager will also truncate, but this is faster)
+    if len(output) > 50000:
+        output = output[:50000] + "\n... (output truncated at 50KB)"
+
+    return output if output else "(no output)"
+
+
+async def run_subprocess_async(
+    argv: List[str], cwd: str, env: dict, timeout: float, input: Optional[bytes] = None
+) -> Tuple[str, str, int]:
+    """
+    Run argv without blocking the event loop.
+
+    Args:
+        input: Bytes written to the process's stdin, if any
+
+    Returns:
+        (stdout, stderr, returncode)
+
+    Raises:
+        subprocess.TimeoutExpired: If the process outlives timeout; its
+            process group is killed
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE if input is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(input), timeout)
+    except asyncio.TimeoutError:
+        # Kill the whole group so grandchildren don't hold the pipes open
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(argv, timeout)
+    return out.decode(errors="replace"), err.decode(errors="replace"), proc.returncode
+
+
+def _prepare(args: dict) -> Tuple[str, int, Optional[str]]:
+    """Command, clamped timeout and an error message if the command is blocked."""
     command = args["command"]
     timeout = args.get("timeout", 120)  # 2 minutes default
 
@@ -32,39 +91,68 @@ def execute_bash(args: dict, ctx) -> str:
     dangerous_simple = ["rm -rf /", "rm -rf /*", "> /dev/sda", "mkfs", ":(){ :|:& };:"]
     for d in dangerous_simple:
         if d in command:
-            return f"Error: Blocked potentially dangerous command"
+            return command, timeout, "Error: Blocked potentially dangerous command"
+    return command, timeout, None
+
+
+# Commands containing any of these need /bin/sh to interpret them
+_SHELL_META = frozenset("|&;<>()$`\\*?[]#~{}!\n")
+# Shell builtins and keywords, which have no (or a different) executable
+_SHELL_BUILTINS = frozenset(
+    "alias bg break builtin case cd command continue declare eval exec exit "
+    "export fg for getopts hash if jobs let local read readonly return set "
+    "shift source time times trap type ulimit umask unalias unset wait while .".split()
+)
 
+
+def _direct_argv(command: str) -> Optional[List[str]]:
+    """
+    argv for a command simple enough to exec without a shell, else None.
+
+    Skipping /bin/sh saves a fork+exec per call for commands like
+    `git status` or `ls -la`.
+    """
+    if os.name != "posix" or any(c in _SHELL_META for c in command):
+        return None
     try:
-        # Prepare environment
-        env = os.environ.copy()
-        env["TERM"] = "dumb"  # Disable terminal features
-        env["NO_COLOR"] = "1"  # Disable colored output
-
-        # Run command
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=ctx.working_dir,
-            env=env,
-        )
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] in _SHELL_BUILTINS or "=" in argv[0]:
+        return None
+    # Leave "not found" reporting (exit 127) to the shell
+    if shutil.which(argv[0]) is None:
+        return None
+    return argv
 
-        output = result.stdout
-        if result.stderr:
-            if output:
-                output += "\n"
-            output += f"[stderr]\n{result.stderr}"
 
-        if result.returncode != 0:
-            output += f"\n[exit code: {result.returncode}]"
+def _shell_env() -> dict:
+    env = os.environ.copy()
+    env["TERM"] = "dumb"  # Disable terminal features
+    env["NO_COLOR"] = "1"  # Disable colored output
+    return env
 
-        # Truncate long output (security manager will also truncate, but this is faster)
-        if len(output) > 50000:
-            output = output[:50000] + "\n... (output truncated at 50KB)"
 
-        return output if output else "(no output)"
+def execute_bash(args: dict, ctx) -> str:
+    """Execute shell command with security controls."""
+    command, timeout, blocked = _prepare(args)
+    if blocked:
+        return blocked
+
+    try:
+        # Run command, directly when no shell features are needed
+        argv = _direct_argv(command)
+        run_kwargs = dict(
+            capture_output=True, text=True, timeout=timeout, cwd=ctx.working_dir, env=_shell_env()
+        )
+        try:
+            result = subprocess.run(argv, **run_kwargs) if argv else None
+        except OSError:
+            # e.g. a script without a shebang, which sh would still run
+            result = None
+        if result is None:
+            result = subprocess.run(command, shell=True, **run_kwargs)
+        return format_process_output(result.stdout, result.stderr, result.returncode)
 
     except subprocess.TimeoutExpired:
         return f"Error: Command timed out after {timeout} seconds"
@@ -74,6 +162,33 @@ def execute_bash(args: dict, ctx) -> str:
         return f"Error executing command: {str(e)}"
 
 
+async def execute_bash_async(args: dict, ctx) -> str:
+    """Awaitable execute_bash, so independent commands can run concurrently."""
+    command, timeout, blocked = _prepare(args)
+    if blocked:
+        return blocked
+
+    try:
+        shell_argv = ["/bin/sh", "-c", command]
+        argv = _direct_argv(command) or shell_argv
+        try:
+            stdout, stderr, returncode = await run_subprocess_async(
+                argv, ctx.working_dir, _shell_env(), timeout
+            )
+        except OSError:
+            if argv is shell_argv:
+                raise
+            stdout, stderr, returncode = await run_subprocess_async(
+                shell_argv, ctx.working_dir, _shell_env(), timeout
+            )
+        return format_process_output(stdout, stderr, returncode)
+
+    except subprocess.TimeoutExpired:
+        return f"Error: Command timed out after {timeout} seconds"
+    except Exception as e:
+        return f"Error executing command: {str(e)}"
+
+
 # Tool definition
 def get_tool():
     """Get bash tool."""
@@ -1,7 +1,13 @@
 """
 Document Tools - Word, Excel, Markdown generation
 """
+import math
 import os
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from .file_ops import write_text
 
 # Lazy import
 Tool = None
@@ -15,6 +21,133 @@ def _get_tool_class():
     return Tool
 
 
+# Heavy optional dependencies, imported on first use
+_pd = None
+_Document = None
+
+
+def _get_pandas():
+    global _pd
+    if _pd is None:
+        import pandas
+
+        _pd = pandas
+    return _pd
+
+
+def _get_document_class():
+    global _Document
+    if _Document is None:
+        from docx import Document
+
+        _Document = Document
+    return _Document
+
+
+# Above this many rows create_excel writes the .xlsx XML itself
+DIRECT_XLSX_MIN_ROWS = 5000
+
+# Control characters that are not allowed in XML 1.0
+_XML_ILLEGAL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Fixed parts of a single-sheet workbook
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value) -> str:
+    """One <c> element for a scalar value."""
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        # NaN and infinities have no cell representation
+        return f"<c><v>{value!r}</v></c>" if math.isfinite(value) else "<c/>"
+    text = escape(_XML_ILLEGAL_RE.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _write_xlsx_direct(filepath: str, sheet_name: str, keys: list, rows: list):
+    """
+    Write a single-sheet .xlsx by streaming the sheet XML into the zip.
+
+    Cells carry no styles; strings are written inline rather than through
+    a shared-strings table.
+    """
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(name=quoteattr(sheet_name)))
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _XLSX_STYLES)
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_XLSX_SHEET_HEAD.encode())
+            lines = []
+            if keys:
+                lines.append("<row>" + "".join(_xlsx_cell(k) for k in keys) + "</row>")
+            for row in rows:
+                lines.append("<row>" + "".join(_xlsx_cell(row.get(k)) for k in keys) + "</row>")
+                if len(lines) >= 1000:
+                    sheet.write("".join(lines).encode())
+                    lines = []
+            sheet.write(("".join(lines) + _XLSX_SHEET_TAIL).encode())
+
+
 def create_word_doc(args: dict, ctx) -> str:
     """Create Word document."""
     filepath = args["filepath"]
@@ -30,9 +163,7 @@ def create_word_doc(args: dict, ctx) -> str:
         filepath += ".docx"
 
     try:
-        from docx import Document
-
-        doc = Document()
+        doc = _get_document_class()()
 
         if title:
             doc.add_heading(title, 0)
@@ -71,15 +202,32 @@ def create_excel(args: dict, ctx) -> str:
         filepath += ".xlsx"
 
     try:
-        import pandas as pd
-
-        df = pd.DataFrame(data)
-
         # Create directory if needed
         dir_path = os.path.dirname(filepath)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
 
+        if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+            # Columns in first-seen order, as pandas.DataFrame(data) would give
+            keys = list(dict.fromkeys(k for row in data for k in row))
+            if len(data) > DIRECT_XLSX_MIN_ROWS:
+                _write_xlsx_direct(filepath, sheet_name, keys, data)
+                return f"Created Excel file: {filepath} ({len(data)} rows)"
+
+            # Rows of dicts go straight to a streaming openpyxl workbook
+            from openpyxl import Workbook
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet(sheet_name)
+            if keys:
+                ws.append(keys)
+            for row in data:
+                ws.append([row.get(k) for k in keys])
+            wb.save(filepath)
+            return f"Created Excel file: {filepath} ({len(data)} rows)"
+
+        pd = _get_pandas()
+        df = pd.DataFrame(data)
         df.to_excel(filepath, sheet_name=sheet_name, index=False)
         return f"Created Excel file: {filepath} ({len(df)} rows)"
 
@@ -108,8 +256,7 @@ def create_markdown(args: dict, ctx) -> str:
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        write_text(filepath, content)
 
         return f"Created Markdown file: {filepath}"
 
@@ -1,9 +1,15 @@
 """
 File Operations Tools - Read, write, edit, glob, list directory
 """
+import fnmatch
+import io
+import mmap
 import os
-import glob as globlib
-from typing import Dict
+import re
+import stat
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 
 # Import will be done at runtime to avoid circular imports
 Tool = None
@@ -19,11 +25,190 @@ def _get_tool_classes():
     return Tool, ToolContext
 
 
+# Never descended into by wildcards; a pattern can still name them literally
+GLOB_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv", "dist", "build"})
+
+_GLOB_MAGIC_RE = re.compile(r"[*?[]")
+_SEP_RE = re.compile(r"[\\/]" if os.altsep else re.escape(os.sep))
+
+
+@lru_cache(maxsize=256)
+def _component_re(part: str):
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(fnmatch.translate(part), flags)
+
+
+def _scan(dirpath: str):
+    try:
+        with os.scandir(dirpath or ".") as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+def _glob_walk(dirpath: str, parts: list, i: int, out: list):
+    """
+    Append (path, mtime) for files under dirpath matching parts[i:].
+
+    Follows glob.glob(recursive=True) rules: wildcards skip hidden names
+    unless the component starts with "." and "**" spans any number of
+    directories.
+    """
+    part = parts[i]
+    last = i == len(parts) - 1
+
+    if part == "**":
+        # Zero directories, then every non-hidden subdirectory in turn
+        if last:
+            _glob_walk(dirpath, parts[:i] + ["*"], i, out)
+        else:
+            _glob_walk(dirpath, parts, i + 1, out)
+        for entry in _scan(dirpath):
+            if (
+                not entry.name.startswith(".")
+                and entry.name not in GLOB_SKIP_DIRS
+                and entry.is_dir(follow_symlinks=False)
+            ):
+                _glob_walk(os.path.join(dirpath, entry.name), parts, i, out)
+        return
+
+    if not _GLOB_MAGIC_RE.search(part):
+        path = os.path.join(dirpath, part)
+        if last:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            if stat.S_ISREG(st.st_mode):
+                out.append((path, st.st_mtime))
+        elif os.path.isdir(path):
+            _glob_walk(path, parts, i + 1, out)
+        return
+
+    match = _component_re(part).match
+    hidden_ok = part.startswith(".")
+    for entry in _scan(dirpath):
+        name = entry.name
+        if (name.startswith(".") and not hidden_ok) or not match(name):
+            continue
+        try:
+            if last:
+                if entry.is_file():
+                    out.append((os.path.join(dirpath, name), entry.stat().st_mtime))
+            elif name not in GLOB_SKIP_DIRS and entry.is_dir():
+                _glob_walk(os.path.join(dirpath, name), parts, i + 1, out)
+        except OSError:
+            continue
+
+
+def _glob_files(full_pattern: str) -> List[Tuple[str, float]]:
+    """(path, mtime) of files matching full_pattern."""
+    parts = _SEP_RE.split(full_pattern)
+    # Start the walk below the longest wildcard-free prefix
+    n = 0
+    while n < len(parts) - 1 and not _GLOB_MAGIC_RE.search(parts[n]):
+        n += 1
+    base = os.sep.join(parts[:n])
+    if n and not base:
+        base = os.sep
+    out = []
+    _glob_walk(base, parts, n, out)
+    return out
+
+
+# Files at least this large are searched through mmap instead of decoded text
+MMAP_MIN_BYTES = 1 << 20
+
+
+def _mmap_line_offset(fb, n: int) -> Optional[int]:
+    """
+    Byte offset where line n starts (0-based) in a large binary file, or
+    None to read it as text instead.
+
+    Lines are counted on raw bytes, so files containing CR (which text
+    mode treats as a newline) are left to the text path.
+    """
+    if os.fstat(fb.fileno()).st_size < MMAP_MIN_BYTES:
+        return None
+    with mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos, remaining = 0, n
+        while remaining and pos < len(mm):
+            chunk = mm[pos : pos + MMAP_MIN_BYTES]
+            newlines = chunk.count(b"\n")
+            if newlines < remaining:
+                if b"\r" in chunk:
+                    return None
+                remaining -= newlines
+                pos += len(chunk)
+                continue
+            idx = -1
+            for _ in range(remaining):
+                idx = chunk.find(b"\n", idx + 1)
+            if b"\r" in chunk[: idx + 1]:
+                return None
+            return pos + idx + 1
+        return pos
+
+
+def _mmap_find_all(path: str, needle: bytes, max_hits: Optional[int] = None) -> Optional[List[int]]:
+    """
+    Byte offsets of non-overlapping occurrences of needle, or None when
+    the file contains CR and must go through text-mode newline handling.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm.find(b"\r") != -1:
+            return None
+        positions = []
+        pos = mm.find(needle)
+        while pos != -1 and (max_hits is None or len(positions) < max_hits):
+            positions.append(pos)
+            pos = mm.find(needle, pos + len(needle))
+        return positions
+
+
+def _splice(path: str, positions: List[int], old_len: int, new: bytes):
+    """Replace old_len bytes at each position with new, rewriting only from the first."""
+    with open(path, "r+b") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pieces = []
+            for k, pos in enumerate(positions):
+                end = positions[k + 1] if k + 1 < len(positions) else len(mm)
+                pieces.append(new)
+                pieces.append(mm[pos + old_len : end])
+        f.seek(positions[0])
+        f.write(b"".join(pieces))
+        f.truncate()
+
+
+def _not_found_error(old_string: str) -> str:
+    # Provide helpful error message
+    if len(old_string) > 50:
+        preview = old_string[:50] + "..."
+    else:
+        preview = old_string
+    return f"Error: old_string not found in file. Looking for: '{preview}'"
+
+
+def _ambiguous_error(count: int) -> str:
+    return f"Error: old_string appears {count} times. Use replace_all=true or provide more context to make it unique."
+
+
+def _count_remaining_lines(f) -> int:
+    """Count the lines left in a text file without building them."""
+    count = 0
+    tail = ""
+    for chunk in iter(lambda: f.read(1 << 20), ""):
+        count += chunk.count("\n")
+        tail = chunk
+    # A final line without a trailing newline still counts
+    return count + (1 if tail and not tail.endswith("\n") else 0)
+
+
 def read_file(args: dict, ctx) -> str:
     """Read file contents with line numbers."""
     path = args["file_path"]
-    offset = args.get("offset", 0)
-    limit = args.get("limit", 2000)
+    offset = max(0, args.get("offset", 0))
+    limit = max(0, args.get("limit", 2000))
 
     # Handle relative paths
     if not os.path.isabs(path):
@@ -32,25 +217,30 @@ def read_file(args: dict, ctx) -> str:
     # Normalize path
     path = os.path.normpath(path)
 
-    if not os.path.exists(path):
+    # No exists/isdir pre-checks: open() reports both, saving two stats
+    try:
+        with open(path, "rb") as fb:
+            st = os.fstat(fb.fileno())
+            # Jump straight to the offset in large files
+            start = _mmap_line_offset(fb, offset) if offset else None
+            fb.seek(start or 0)
+            f = io.TextIOWrapper(fb, encoding="utf-8", errors="replace")
+            # Apply offset and limit without materializing the whole file
+            skip = 0 if start is not None else offset
+            selected = list(islice(f, skip, skip + limit))
+            total_lines = offset + len(selected)
+            # The rest only matters for the "showing X of Y" note
+            if len(selected) == limit:
+                total_lines += _count_remaining_lines(f)
+    except (FileNotFoundError, NotADirectoryError):
         return f"Error: File not found: {path}"
-
-    if os.path.isdir(path):
+    except IsADirectoryError:
         return f"Error: Path is a directory, not a file: {path}"
-
-    try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
     except IOError as e:
         return f"Error reading file: {e}"
 
     # Track file as read
-    ctx.mark_file_read(path)
-
-    total_lines = len(lines)
-
-    # Apply offset and limit
-    selected = lines[offset : offset + limit]
+    ctx.mark_file_read(path, st)
 
     # Format with line numbers
     result = []
@@ -70,6 +260,24 @@ def read_file(args: dict, ctx) -> str:
     return output
 
 
+WRITE_CHUNK_BYTES = 1 << 20
+
+
+def write_text(path: str, content: str):
+    """
+    Write content as UTF-8, encoding it once up front.
+
+    Same result as text-mode open(path, "w", encoding="utf-8"), without
+    the text layer's per-chunk encode and copy.
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    data = memoryview(content.encode("utf-8"))
+    with open(path, "wb") as f:
+        for i in range(0, len(data), WRITE_CHUNK_BYTES):
+            f.write(data[i : i + WRITE_CHUNK_BYTES])
+
+
 def write_file(args: dict, ctx) -> str:
     """Write content to file."""
     path = args["file_path"]
@@ -91,8 +299,7 @@ def write_file(args: dict, ctx) -> str:
         os.makedirs(dir_path, exist_ok=True)
 
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        write_text(path, content)
     except IOError as e:
         return f"Error writing file: {e}"
 
@@ -116,8 +323,34 @@ def edit_file(args: dict, ctx) -> str:
     if not ctx.was_file_read(path):
         return "Error: Must read file before editing. Use read_file first."
 
-    if not os.path.exists(path):
+    try:
+        size = os.stat(path).st_size
+    except (FileNotFoundError, NotADirectoryError):
         return f"Error: File not found: {path}"
+    except OSError as e:
+        return f"Error reading file: {e}"
+
+    if not old_string:
+        return "Error: old_string must not be empty."
+
+    # Large files are edited as bytes in place: no decode, and the part
+    # before the first match is not rewritten
+    if size >= MMAP_MIN_BYTES:
+        needle = old_string.encode("utf-8")
+        try:
+            positions = _mmap_find_all(path, needle, None if replace_all else 2)
+        except (IOError, ValueError) as e:
+            return f"Error reading file: {e}"
+        if positions is not None:
+            if not positions:
+                return _not_found_error(old_string)
+            if len(positions) > 1 and not replace_all:
+                return _ambiguous_error(len(_mmap_find_all(path, needle)))
+            try:
+                _splice(path, positions, len(needle), new_string.encode("utf-8"))
+            except IOError as e:
+                return f"Error writing file: {e}"
+            return _edited(path, len(positions))
 
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -125,26 +358,18 @@ def edit_file(args: dict, ctx) -> str:
     except IOError as e:
         return f"Error reading file: {e}"
 
-    # Check if old_string exists
-    count = content.count(old_string)
-    if count == 0:
-        # Provide helpful error message
-        if len(old_string) > 50:
-            preview = old_string[:50] + "..."
-        else:
-            preview = old_string
-        return f"Error: old_string not found in file. Looking for: '{preview}'"
+    # One scan both finds and splits out the occurrences; a single
+    # replacement only needs to know whether there is a second one
+    parts = content.split(old_string) if replace_all else content.split(old_string, 2)
+    if len(parts) == 1:
+        return _not_found_error(old_string)
 
-    if count > 1 and not replace_all:
-        return f"Error: old_string appears {count} times. Use replace_all=true or provide more context to make it unique."
+    if len(parts) > 2 and not replace_all:
+        return _ambiguous_error(content.count(old_string))
 
     # Replace
-    if replace_all:
-        new_content = content.replace(old_string, new_string)
-        replaced_count = count
-    else:
-        new_content = content.replace(old_string, new_string, 1)
-        replaced_count = 1
+    new_content = new_string.join(parts)
+    replaced_count = len(parts) - 1
 
     try:
         with open(path, "w", encoding="utf-8") as f:
@@ -152,6 +377,10 @@ def edit_file(args: dict, ctx) -> str:
     except IOError as e:
         return f"Error writing file: {e}"
 
+    return _edited(path, replaced_count)
+
+
+def _edited(path: str, replaced_count: int) -> str:
     return f"Successfully edited {path} ({replaced_count} replacement{'s' if replaced_count > 1 else ''})"
 
 
@@ -164,14 +393,11 @@ def glob_files(args: dict, ctx) -> str:
     if not os.path.isabs(path):
         path = os.path.join(ctx.working_dir, path)
 
-    full_pattern = os.path.join(path, pattern)
-    matches = globlib.glob(full_pattern, recursive=True)
-
-    # Filter out directories, keep only files
-    matches = [m for m in matches if os.path.isfile(m)]
+    # Files only
+    found = _glob_files(os.path.join(path, pattern))
 
     # Sort by modification time, newest first
-    matches = sorted(matches, key=lambda x: os.path.getmtime(x), reverse=True)
+    matches = [p for p, _ in sorted(found, key=lambda m: m[1], reverse=True)]
 
     # Limit to 100 results
     if len(matches) > 100:
@@ -190,6 +416,17 @@ def glob_files(args: dict, ctx) -> str:
     return result
 
 
+_UNITS = ("B", "KB", "MB")
+
+
+def _format_size(size: int) -> str:
+    """Human-readable size; the unit comes from the bit length, not a compare chain."""
+    i = min((size.bit_length() - 1) // 10, 2) if size else 0
+    if i == 0:
+        return f"{size} B"
+    return f"{size / (1 << (10 * i)):.1f} {_UNITS[i]}"
+
+
 def list_directory(args: dict, ctx) -> str:
     """List directory contents."""
     path = args.get("path", ctx.working_dir)
@@ -200,30 +437,27 @@ def list_directory(args: dict, ctx) -> str:
 
     path = os.path.normpath(path)
 
-    if not os.path.exists(path):
-        return f"Error: Path not found: {path}"
-
-    if not os.path.isdir(path):
-        return f"Error: Not a directory: {path}"
-
     entries = []
     try:
-        for entry in sorted(os.listdir(path)):
-            full_path = os.path.join(path, entry)
-            if os.path.isdir(full_path):
+        # DirEntry caches the file type (and stat on Windows) from readdir
+        with os.scandir(path) as it:
+            dir_entries = sorted(it, key=lambda e: e.name)
+        for e in dir_entries:
+            entry = e.name
+            if e.is_dir():
                 entries.append(f"[DIR]  {entry}/")
             else:
                 try:
-                    size = os.path.getsize(full_path)
-                    if size < 1024:
-                        size_str = f"{size} B"
-                    elif size < 1024 * 1024:
-                        size_str = f"{size / 1024:.1f} KB"
-                    else:
-                        size_str = f"{size / (1024 * 1024):.1f} MB"
-                    entries.append(f"[FILE] {entry} ({size_str})")
+                    entries.append(f"[FILE] {entry} ({_format_size(e.stat().st_size)})")
                 except OSError:
                     entries.append(f"[FILE] {entry}")
+    except FileNotFoundError:
+        return f"Error: Path not found: {path}"
+    except NotADirectoryError:
+        # Also raised when a parent component is a file; only stat on failure
+        if not os.path.exists(path):
+            return f"Error: Path not found: {path}"
+        return f"Error: Not a directory: {path}"
     except PermissionError:
         return f"Error: Permission denied: {path}"
 
@@ -1,10 +1,15 @@
 """
 Python Execution Tool - Sandboxed Python code execution
 """
+import asyncio
 import subprocess
-import tempfile
 import os
+import queue
 import sys
+import threading
+from typing import Tuple
+
+from .bash import format_process_output, run_subprocess_async
 
 # Lazy import
 Tool = None
@@ -18,60 +23,196 @@ def _get_tool_class():
     return Tool
 
 
-def execute_python(args: dict, ctx) -> str:
-    """Execute Python code in isolated subprocess."""
-    code = args["code"]
+def _python_env() -> dict:
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"  # Don't leave __pycache__ in the workspace
+    return env
+
+
+def _timeout(args: dict) -> int:
     timeout = args.get("timeout", 60)  # 1 minute default
+    return min(timeout, 300)  # Max 5 minutes for Python
 
-    # Validate timeout
-    if timeout > 300:
-        timeout = 300  # Max 5 minutes for Python
 
-    # Create temp file for code
-    fd, temp_path = tempfile.mkstemp(suffix=".py", prefix="agent_exec_")
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(code)
+# Opt-in: run code in warm, reused interpreters instead of a fresh one per
+# call. Module imports, cwd-independent globals and sys state persist
+# between calls in the same worker.
+POOL_ENABLED = os.environ.get("AGENT_PYEXEC_POOL") == "1"
+POOL_SIZE = 2
+
+
+def _pool_worker(conn):
+    """Worker loop: run each (code, cwd) received and send back the result."""
+    import builtins
+    import tempfile
+    import traceback
+
+    os.environ["PYTHONDONTWRITEBYTECODE"] = "1"
+    sys.dont_write_bytecode = True
+    sys.argv = ["-"]
+    while True:
+        try:
+            code, cwd = conn.recv()
+        except EOFError:
+            return
+        returncode = 0
+        # Capture at the fd level so child processes and C extensions are included
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            saved = os.dup(1), os.dup(2)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(out.fileno(), 1)
+            os.dup2(err.fileno(), 2)
+            try:
+                os.chdir(cwd)
+                exec(
+                    compile(code, "<stdin>", "exec"),
+                    {"__name__": "__main__", "__builtins__": builtins},
+                )
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    returncode = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except BaseException as e:
+                # Drop this function's frame, like a top-level script traceback
+                traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+                returncode = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os.dup2(saved[0], 1)
+                os.dup2(saved[1], 2)
+                os.close(saved[0])
+                os.close(saved[1])
+            out.seek(0)
+            err.seek(0)
+            result = (
+                out.read().decode("utf-8", errors="replace"),
+                err.read().decode("utf-8", errors="replace"),
+                returncode,
+            )
+        conn.send(result)
+
+
+class _PyExecPool:
+    """Bounded set of warm interpreter processes for python_exec."""
+
+    def __init__(self, size: int = POOL_SIZE):
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @staticmethod
+    def _spawn():
+        import multiprocessing
+
+        # spawn, not fork: the parent (e.g. a Jupyter kernel) has threads
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=_pool_worker, args=(child_conn,), daemon=True)
+        proc.start()
+        child_conn.close()
+        return proc, parent_conn
+
+    def run(self, code: str, cwd: str, timeout: float) -> Tuple[str, str, int]:
+        """
+        Run code in a warm worker.
+
+        Raises:
+            subprocess.TimeoutExpired: If the code outlives timeout; the
+                worker is killed and replaced on next use
+        """
+        with self._slots:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                worker = self._spawn()
+            proc, conn = worker
+            reusable = False
+            try:
+                conn.send((code, cwd))
+                if not conn.poll(timeout):
+                    raise subprocess.TimeoutExpired("python_exec", timeout)
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    proc.join(1)
+                    raise RuntimeError(f"Python worker exited unexpectedly (exit code {proc.exitcode})")
+                reusable = True
+                return result
+            finally:
+                if reusable:
+                    self._idle.put(worker)
+                else:
+                    proc.kill()
+                    conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> _PyExecPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _PyExecPool()
+        return _pool
+
 
-        # Prepare environment
-        env = os.environ.copy()
-        env["PYTHONIOENCODING"] = "utf-8"
+def execute_python(args: dict, ctx) -> str:
+    """Execute Python code in isolated subprocess."""
+    timeout = _timeout(args)
+    try:
+        if POOL_ENABLED:
+            stdout, stderr, returncode = _get_pool().run(args["code"], ctx.working_dir, timeout)
+            return format_process_output(stdout, stderr, returncode)
 
-        # Run in subprocess
+        # Code is piped to `python -`, so nothing is written to disk
         result = subprocess.run(
-            [sys.executable, temp_path],
+            [sys.executable, "-"],
+            input=args["code"],
             capture_output=True,
             text=True,
+            encoding="utf-8",
             timeout=timeout,
             cwd=ctx.working_dir,
-            env=env,
+            env=_python_env(),
         )
+        return format_process_output(result.stdout, result.stderr, result.returncode)
 
-        output = result.stdout
-        if result.stderr:
-            if output:
-                output += "\n"
-            output += f"[stderr]\n{result.stderr}"
-
-        if result.returncode != 0:
-            output += f"\n[exit code: {result.returncode}]"
+    except subprocess.TimeoutExpired:
+        return f"Error: Code execution timed out after {timeout} seconds"
+    except Exception as e:
+        return f"Error executing Python code: {str(e)}"
 
-        # Truncate long output
-        if len(output) > 50000:
-            output = output[:50000] + "\n... (output truncated at 50KB)"
 
-        return output if output else "(no output)"
+async def execute_python_async(args: dict, ctx) -> str:
+    """Awaitable execute_python, so independent runs can overlap."""
+    timeout = _timeout(args)
+    try:
+        if POOL_ENABLED:
+            loop = asyncio.get_event_loop()
+            stdout, stderr, returncode = await loop.run_in_executor(
+                None, _get_pool().run, args["code"], ctx.working_dir, timeout
+            )
+            return format_process_output(stdout, stderr, returncode)
+
+        stdout, stderr, returncode = await run_subprocess_async(
+            [sys.executable, "-"],
+            ctx.working_dir,
+            _python_env(),
+            timeout,
+            input=args["code"].encode("utf-8"),
+        )
+        return format_process_output(stdout, stderr, returncode)
 
     except subprocess.TimeoutExpired:
         return f"Error: Code execution timed out after {timeout} seconds"
     except Exception as e:
         return f"Error executing Python code: {str(e)}"
-    finally:
-        # Clean up temp file
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
 
 
 # Tool definition
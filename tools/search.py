@@ -1,10 +1,25 @@
 """
 Search Tools - Grep and Semantic Search
 """
+import base64
+import io
+import mmap
 import os
 import re
 import json
-from typing import List, Dict, Tuple, Optional
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Dict, Tuple, Optional
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants, _parser as _sre_parse
+except ImportError:
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
 
 # Lazy imports to avoid circular dependencies
 Tool = None
@@ -18,6 +33,281 @@ def _get_tool_class():
     return Tool
 
 
+# Files read concurrently by grep; reads overlap with regex work
+GREP_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# ripgrep, when installed, does the scanning for grep
+_RG = shutil.which("rg")
+# Python regex syntax ripgrep's engine rejects or reads differently
+# (lookaround, backreferences, \Z, nested or set-operation classes)
+_PY_ONLY_RE = re.compile(r"\(\?<?[=!]|\(\?P=|\\[1-9]|\\Z|\[\[|&&|--|~~")
+# Explicit file lists longer than this are not passed on the command line
+_RG_MAX_FILE_ARGS = 2000
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int):
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=256)
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    Longest literal run (3+ chars) every match of pattern must contain.
+
+    Only top-level literals count; None for case-insensitive or
+    unparsable patterns.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return None
+    if parsed.state.flags & _sre_constants.SRE_FLAG_IGNORECASE:
+        return None
+    best, run = "", []
+    for op, arg in list(parsed) + [(None, None)]:
+        if op is _sre_constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    return best if len(best) >= 3 else None
+
+
+def _walk_files(path: str) -> Iterator[str]:
+    """Non-hidden files under path."""
+    for root, dirs, filenames in os.walk(path):
+        # Skip hidden directories
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for f in filenames:
+            if not f.startswith("."):
+                yield os.path.join(root, f)
+
+
+def _rg_text(field: dict) -> str:
+    """Decode a ripgrep JSON text field, which is base64 for non-UTF-8 data."""
+    if "text" in field:
+        return field["text"]
+    return base64.b64decode(field["bytes"]).decode("utf-8", errors="replace")
+
+
+def _rg_scan(
+    pattern: str,
+    path: str,
+    files: Optional[List[str]],
+    output_mode: str,
+    context_lines: int,
+    case_insensitive: bool,
+    limit: int,
+) -> Optional[List[List[List[str]]]]:
+    """
+    Run the search with ripgrep.
+
+    Returns:
+        Per-file matches shaped like _scan_file results, or None if
+        ripgrep could not run the search and the Python scan should
+    """
+    mode_args = {
+        "files_with_matches": ["--files-with-matches"],
+        "count": ["--count", "--with-filename"],
+        "content": ["--json"],
+    }.get(output_mode)
+    if mode_args is None:
+        return None
+
+    # Same file set as the Python walk: hidden entries skipped, ignore files not honoured.
+    # Output is sorted by path so truncating to limit is deterministic
+    argv = [
+        _RG, "--no-config", "--no-ignore", "--no-messages", "--sort", "path",
+        "--max-count", str(limit),
+    ]
+    if case_insensitive:
+        argv.append("--ignore-case")
+    argv += mode_args + ["-e", pattern, "--"] + (files if files is not None else [path])
+    try:
+        proc = subprocess.run(argv, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    # Exit 2 without output means ripgrep rejected the search (e.g. the regex)
+    if proc.returncode not in (0, 1) and not proc.stdout:
+        return None
+
+    lines = proc.stdout.splitlines()
+    if output_mode == "files_with_matches":
+        return [[[os.fsdecode(line)]] for line in lines]
+    if output_mode == "count":
+        per_file = []
+        for line in lines:
+            filepath, _, count = line.rpartition(b":")
+            per_file.append([[os.fsdecode(filepath)]] * int(count))
+        return per_file
+
+    per_file = []
+    current = None
+    for line in lines:
+        event = json.loads(line)
+        if event["type"] == "begin":
+            current = []
+            per_file.append(current)
+        elif event["type"] == "match":
+            data = event["data"]
+            current.append((_rg_text(data["path"]), data["line_number"], _rg_text(data["lines"])))
+
+    results = []
+    for matches in per_file:
+        if not matches:
+            continue
+        filepath = matches[0][0]
+        if context_lines <= 0:
+            results.append([[f"{filepath}:{n}> {text.rstrip()}"] for _, n, text in matches])
+            continue
+        # Context comes from the file itself, one block per match as in _scan_file
+        try:
+            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                file_lines = f.readlines()
+        except (IOError, PermissionError):
+            continue
+        blocks = []
+        for _, n, _ in matches:
+            i = n - 1
+            start = max(0, i - context_lines)
+            end = min(len(file_lines), i + context_lines + 1)
+            blocks.append(
+                [
+                    f"{filepath}:{j + 1}{'>' if j == i else ' '} {file_lines[j].rstrip()}"
+                    for j in range(start, end)
+                ]
+            )
+        results.append(blocks)
+    return results
+
+
+# Extensions grep never opens: images, archives, compiled objects, fonts
+_BINARY_EXTENSIONS = frozenset(
+    ".png .jpg .jpeg .gif .bmp .ico .webp .pdf .pyc .pyo .so .o .a .dll .dylib .exe "
+    ".class .jar .whl .zip .gz .bz2 .xz .tar .7z .woff .woff2 .ttf .otf .wasm .npy .npz".split()
+)
+# Like git grep and ripgrep, treat a NUL in the first block as binary
+_BINARY_PROBE_BYTES = 8192
+
+
+# Above this size a required literal is looked up in the raw bytes first
+GREP_MMAP_MIN_BYTES = 256 * 1024
+
+
+def _lacks_literal(fb, literal: str) -> bool:
+    """
+    True if a large file certainly does not contain literal.
+
+    The check runs on the memory-mapped bytes, so the file is never
+    decoded. Literals whose bytes can differ from the decoded text
+    (newlines, U+FFFD) are not checked.
+    """
+    if "\n" in literal or "\r" in literal or "\ufffd" in literal:
+        return False
+    if os.fstat(fb.fileno()).st_size < GREP_MMAP_MIN_BYTES:
+        return False
+    with mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.find(literal.encode("utf-8")) == -1
+
+
+def _advise(fd: int, whole_file: bool):
+    """Hint the kernel to start readahead (Linux/BSD; a no-op elsewhere)."""
+    if hasattr(os, "posix_fadvise"):
+        advice = os.POSIX_FADV_WILLNEED if whole_file else os.POSIX_FADV_SEQUENTIAL
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+
+
+def _scan_file(
+    filepath: str,
+    regex,
+    output_mode: str,
+    context_lines: int,
+    limit: int,
+    literal: Optional[str] = None,
+) -> List[List[str]]:
+    """
+    Matches in one file, at most limit.
+
+    If literal is given (see _required_literal), files without it are
+    rejected with one substring search before any regex work.
+
+    Returns:
+        One list of output lines per match (the path alone unless output
+        mode is "content")
+    """
+    matches = []
+    if os.path.splitext(filepath)[1].lower() in _BINARY_EXTENSIONS:
+        return matches
+    try:
+        with open(filepath, "rb") as fb:
+            # Content mode reads the whole file; the others may stop early
+            _advise(fb.fileno(), output_mode == "content")
+            if b"\x00" in fb.read(_BINARY_PROBE_BYTES):
+                return matches
+            if literal is not None and _lacks_literal(fb, literal):
+                return matches
+            fb.seek(0)
+            f = io.TextIOWrapper(fb, encoding="utf-8", errors="replace")
+            if literal is not None:
+                text = f.read()
+                if literal not in text:
+                    return matches
+                # Newlines are already translated, so this splits like readlines()
+                f = io.StringIO(text)
+            if output_mode != "content":
+                # Stream lines; files_with_matches stops at the first hit
+                for line in f:
+                    if regex.search(line):
+                        matches.append([filepath])
+                        if output_mode == "files_with_matches" or len(matches) >= limit:
+                            break
+                return matches
+            lines = f.readlines()
+    except (IOError, PermissionError):
+        return matches
+
+    for i, line in enumerate(lines):
+        if regex.search(line):
+            # Add context lines
+            start = max(0, i - context_lines)
+            end = min(len(lines), i + context_lines + 1)
+            matches.append(
+                [
+                    f"{filepath}:{j + 1}{'>' if j == i else ' '} {lines[j].rstrip()}"
+                    for j in range(start, end)
+                ]
+            )
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def _map_ordered(fn: Callable, items: Iterable, workers: int) -> Iterator:
+    """
+    Lazily yield fn(item) in input order, computing ahead on a thread pool.
+
+    At most 2 * workers calls are in flight, so a consumer that stops
+    early leaves little wasted work.
+    """
+    it = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(fn, item) for item in islice(it, 2 * workers))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(it, 1):
+                    pending.append(pool.submit(fn, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def grep_search(args: dict, ctx) -> str:
     """Search file contents with regex."""
     pattern = args["pattern"]
@@ -35,68 +325,50 @@ def grep_search(args: dict, ctx) -> str:
     # Compile regex
     flags = re.IGNORECASE if case_insensitive else 0
     try:
-        regex = re.compile(pattern, flags)
+        regex = _compile(pattern, flags)
     except re.error as e:
         return f"Error: Invalid regex pattern: {e}"
 
     results = []
 
-    # Find files to search
+    # Find files to search (None: every non-hidden file under path)
+    files = None
     if glob_pattern:
         import glob as globlib
         files = globlib.glob(os.path.join(path, glob_pattern), recursive=True)
         files = [f for f in files if os.path.isfile(f)]
     elif os.path.isfile(path):
         files = [path]
-    else:
-        # Walk directory
-        files = []
-        for root, dirs, filenames in os.walk(path):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-            for f in filenames:
-                if not f.startswith("."):
-                    files.append(os.path.join(root, f))
 
-    match_count = 0
-    files_matched = set()
+    per_file = None
+    if files is not None and not files:
+        per_file = []
+    elif (
+        _RG
+        and not _PY_ONLY_RE.search(pattern)
+        and (files is None or len(files) <= _RG_MAX_FILE_ARGS)
+    ):
+        per_file = _rg_scan(
+            pattern, path, files, output_mode, context_lines, case_insensitive, limit
+        )
+    if per_file is None:
+        literal = None if case_insensitive else _required_literal(pattern)
 
-    for filepath in files:
-        if match_count >= limit:
-            break
+        def scan(filepath):
+            return _scan_file(filepath, regex, output_mode, context_lines, limit, literal)
 
-        try:
-            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-                lines = f.readlines()
-        except (IOError, PermissionError):
-            continue
+        # Files are scanned concurrently but results are taken in file order
+        per_file = _map_ordered(
+            scan, _walk_files(path) if files is None else files, GREP_WORKERS
+        )
 
-        file_matches = []
-        for i, line in enumerate(lines):
-            if regex.search(line):
-                files_matched.add(filepath)
-
-                if output_mode == "files_with_matches":
-                    results.append(filepath)
-                    break
-                elif output_mode == "content":
-                    # Add context lines
-                    start = max(0, i - context_lines)
-                    end = min(len(lines), i + context_lines + 1)
-                    for j in range(start, end):
-                        marker = ">" if j == i else " "
-                        file_matches.append(
-                            f"{filepath}:{j + 1}{marker} {lines[j].rstrip()}"
-                        )
-                elif output_mode == "count":
-                    file_matches.append(filepath)
-
-                match_count += 1
-                if match_count >= limit:
-                    break
-
-        if file_matches and output_mode != "files_with_matches":
-            results.extend(file_matches)
+    match_count = 0
+    for matches in per_file:
+        for lines in matches[: limit - match_count]:
+            results.extend(lines)
+        match_count += min(len(matches), limit - match_count)
+        if match_count >= limit:
+            break
 
     if output_mode == "count":
         from collections import Counter
@@ -1,126 +1,170 @@
 """
 Todo Tools - Task tracking and management
 """
-from typing import List, Dict
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
 
-# Lazy import
-Tool = None
+# Global todo storage (per session, stored in context), one list per
+# field rather than one dict per todo
+_contents: List[str] = []
+_active_forms: List[str] = []
+_statuses: List[int] = []
+# Original text of statuses outside the known set, by position
+_other_statuses: Dict[int, str] = {}
 
+# Snapshot handed out by get_todos(), rebuilt after the list changes
+_snapshot: Optional[Tuple[Dict, ...]] = None
+_dirty = True
 
-def _get_tool_class():
-    global Tool
-    if Tool is None:
-        from core.tools import Tool as T
-        Tool = T
-    return Tool
 
+class Status(IntEnum):
+    """Todo status, stored as a small int and used as a tuple index."""
 
-# Global todo storage (per session, stored in context)
-_todos: List[Dict] = []
+    PENDING = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+    OTHER = 3  # Anything else the model sends; shown as [?]
 
 
-def todo_write(args: dict, ctx) -> str:
-    """Update todo list."""
-    global _todos
-    _todos = args["todos"]
-
-    # Format for display
-    lines = ["Todo List Updated:"]
-    for todo in _todos:
-        status = todo.get("status", "pending")
-        content = todo.get("content", "")
-
-        status_icon = {"pending": "[ ]", "in_progress": "[>]", "completed": "[x]"}.get(
-            status, "[?]"
-        )
-
-        lines.append(f"  {status_icon} {content}")
+_STATUS_BY_NAME = {
+    "pending": Status.PENDING,
+    "in_progress": Status.IN_PROGRESS,
+    "completed": Status.COMPLETED,
+}
+_STATUS_NAMES = ("pending", "in_progress", "completed")
+_ICON_BY_STATUS = ("[ ]", "[>]", "[x]", "[?]")
+# todo_write line prefixes, so each line is a single concatenation
+_LINE_PREFIX = tuple(f"  {icon} " for icon in _ICON_BY_STATUS)
 
-    # Count by status
-    pending = sum(1 for t in _todos if t.get("status") == "pending")
-    in_progress = sum(1 for t in _todos if t.get("status") == "in_progress")
-    completed = sum(1 for t in _todos if t.get("status") == "completed")
 
-    lines.append("")
-    lines.append(f"  ({pending} pending, {in_progress} in progress, {completed} completed)")
+def todo_write(args: dict, ctx) -> str:
+    """Update todo list."""
+    global _contents, _active_forms, _statuses, _other_statuses, _dirty
+    todos = args["todos"]
+    _contents = [""] * len(todos)
+    _active_forms = [""] * len(todos)
+    _statuses = [Status.PENDING] * len(todos)
+    _other_statuses = {}
+    _dirty = True
+
+    # Store and format in one pass. Sized up front: header, one line per
+    # todo, blank line, summary
+    n = len(todos)
+    lines = [""] * (n + 3)
+    lines[0] = "Todo List Updated:"
+    counts = [0, 0, 0, 0]
+    for i, todo in enumerate(todos):
+        name = todo.get("status", "pending")
+        status = _STATUS_BY_NAME.get(name, Status.OTHER)
+        if status is Status.OTHER:
+            _other_statuses[i] = name
+        _statuses[i] = status
+        counts[status] += 1
+        content = _contents[i] = todo.get("content", "")
+        _active_forms[i] = todo.get("activeForm", "")
+
+        lines[i + 1] = _LINE_PREFIX[status] + content
+
+    lines[n + 2] = (
+        f"  ({counts[Status.PENDING]} pending, {counts[Status.IN_PROGRESS]} in progress, "
+        f"{counts[Status.COMPLETED]} completed)"
+    )
 
     return "\n".join(lines)
 
 
 def todo_read(args: dict, ctx) -> str:
     """Read current todo list."""
-    global _todos
-
-    if not _todos:
+    if not _statuses:
         return "No todos. Use todo_write to create a task list."
 
-    lines = ["Current Todos:"]
-    for i, todo in enumerate(_todos, 1):
-        status = todo.get("status", "pending")
-        content = todo.get("content", "")
-        active_form = todo.get("activeForm", "")
-
-        status_icon = {"pending": "[ ]", "in_progress": "[>]", "completed": "[x]"}.get(
-            status, "[?]"
-        )
-
-        line = f"  {i}. {status_icon} {content}"
-        if status == "in_progress" and active_form:
+    lines = [""] * (len(_statuses) + 1)
+    lines[0] = "Current Todos:"
+    for i, (status, content, active_form) in enumerate(
+        zip(_statuses, _contents, _active_forms), 1
+    ):
+        line = f"  {i}. {_ICON_BY_STATUS[status]} {content}"
+        if status is Status.IN_PROGRESS and active_form:
             line += f" (currently: {active_form})"
 
-        lines.append(line)
+        lines[i] = line
 
     return "\n".join(lines)
 
 
-def get_todos() -> List[Dict]:
-    """Get current todo list (for external access)."""
-    global _todos
-    return _todos.copy()
+def get_todos() -> Tuple[Dict, ...]:
+    """
+    Get current todo list (for external access).
+
+    Returns the same immutable snapshot until the list next changes; use
+    list(get_todos()) for a mutable copy.
+    """
+    global _snapshot, _dirty
+    if _dirty or _snapshot is None:
+        _snapshot = tuple(
+            {
+                "content": c,
+                "activeForm": a,
+                "status": _other_statuses[i] if s is Status.OTHER else _STATUS_NAMES[s],
+            }
+            for i, (c, a, s) in enumerate(zip(_contents, _active_forms, _statuses))
+        )
+        _dirty = False
+    return _snapshot
 
 
 def clear_todos():
     """Clear all todos (for session reset)."""
-    global _todos
-    _todos = []
+    global _contents, _active_forms, _statuses, _other_statuses, _dirty
+    _contents = []
+    _active_forms = []
+    _statuses = []
+    _other_statuses = {}
+    _dirty = True
+
+
+# Tool parameter schemas, built once and shared by the Tool objects
+_TODO_WRITE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "todos": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "content": {
+                        "type": "string",
+                        "description": "Task description (imperative form, e.g., 'Fix the bug')",
+                    },
+                    "activeForm": {
+                        "type": "string",
+                        "description": "Present continuous form (e.g., 'Fixing the bug')",
+                    },
+                    "status": {
+                        "type": "string",
+                        "enum": ["pending", "in_progress", "completed"],
+                        "description": "Task status",
+                    },
+                },
+                "required": ["content", "activeForm", "status"],
+            },
+        }
+    },
+    "required": ["todos"],
+}
+
+_TODO_READ_SCHEMA = {"type": "object", "properties": {}, "required": []}
 
 
 # Tool definitions
 def get_tools():
     """Get all todo tools."""
-    Tool = _get_tool_class()
+    from core.tools import Tool
 
     TODO_WRITE = Tool(
         name="todo_write",
         description="Create or update task list. Use for tracking multi-step work. Each todo needs: content (imperative form), activeForm (present continuous), status (pending/in_progress/completed).",
-        parameters={
-            "type": "object",
-            "properties": {
-                "todos": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "content": {
-                                "type": "string",
-                                "description": "Task description (imperative form, e.g., 'Fix the bug')",
-                            },
-                            "activeForm": {
-                                "type": "string",
-                                "description": "Present continuous form (e.g., 'Fixing the bug')",
-                            },
-                            "status": {
-                                "type": "string",
-                                "enum": ["pending", "in_progress", "completed"],
-                                "description": "Task status",
-                            },
-                        },
-                        "required": ["content", "activeForm", "status"],
-                    },
-                }
-            },
-            "required": ["todos"],
-        },
+        parameters=_TODO_WRITE_SCHEMA,
         execute=todo_write,
         requires_approval=False,
     )
@@ -128,7 +172,7 @@ def get_tools():
     TODO_READ = Tool(
         name="todo_read",
         description="Read current todo list to check task status.",
-        parameters={"type": "object", "properties": {}, "required": []},
+        parameters=_TODO_READ_SCHEMA,
         execute=todo_read,
         requires_approval=False,
     )
@@ -136,5 +180,11 @@ def get_tools():
     return TODO_WRITE, TODO_READ
 
 
-# Export tools
-TODO_WRITE, TODO_READ = get_tools()
+# Export tools, built on first access (PEP 562) so importing this module
+# doesn't pull in core.tools
+def __getattr__(name):
+    if name in ("TODO_WRITE", "TODO_READ"):
+        todo_write_tool, todo_read_tool = get_tools()
+        globals().update(TODO_WRITE=todo_write_tool, TODO_READ=todo_read_tool)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,66 +1,125 @@
 """
 Vision Tool - Image analysis using Claude vision
 """
-import base64
+import binascii
+import functools
 import os
-
-# Lazy import
-Tool = None
-
-
-def _get_tool_class():
-    global Tool
-    if Tool is None:
-        from core.tools import Tool as T
-        Tool = T
-    return Tool
-
-
-def view_image(args: dict, ctx) -> dict:
-    """Load image for Claude vision analysis."""
+import stat
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, Union
+
+# SIMD base64 when available; otherwise binascii's C encoder directly,
+# skipping base64.b64encode's Python wrapper
+try:
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    _b64encode = functools.partial(binascii.b2a_base64, newline=False)
+
+_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+# Recent results by (path, st_mtime_ns, st_size), so re-viewing an
+# unchanged image skips the read and encode
+IMAGE_CACHE_SIZE = 4
+_cache: "OrderedDict[Tuple[str, int, int], Dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _check_image(args: dict, ctx) -> Union[dict, Tuple[str, str, os.stat_result]]:
+    """
+    Resolve and validate an image path without reading it.
+
+    Returns:
+        (path, media_type, stat) or an {"error": ...} dict
+    """
     path = args["file_path"]
 
     # Handle relative paths
-    if not os.path.isabs(path):
-        path = os.path.join(ctx.working_dir, path)
+    path = ctx.resolve_path(path)
 
-    if not os.path.exists(path):
+    # One stat gives existence, file type and size, all before any read
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
         return {"error": f"Image not found: {path}"}
+    except OSError as e:
+        return {"error": f"Error reading image: {e}"}
 
     # Determine media type
     ext = os.path.splitext(path)[1].lower()
-    media_types = {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-    }
-
-    media_type = media_types.get(ext)
+    media_type = _MEDIA_TYPES.get(ext)
     if not media_type:
         return {"error": f"Unsupported image format: {ext}. Supported: png, jpg, jpeg, gif, webp"}
 
+    # FIFOs and devices could block or never end; their size means nothing
+    if not stat.S_ISREG(st.st_mode):
+        return {"error": f"Not a regular file: {path}"}
+
     # Check file size (max 20MB for Claude)
-    file_size = os.path.getsize(path)
+    file_size = st.st_size
     if file_size > 20 * 1024 * 1024:
         return {"error": f"Image too large: {file_size / (1024*1024):.1f}MB (max 20MB)"}
 
-    try:
-        with open(path, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
+    return path, media_type, st
+
+
+def view_image(args: dict, ctx) -> dict:
+    """Load image for Claude vision analysis."""
+    checked = _check_image(args, ctx)
+    if isinstance(checked, dict):
+        return checked
+    path, media_type, st = checked
+
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+
+    if result is None:
+        try:
+            with open(path, "rb") as f:
+                data = _b64encode(f.read()).decode("ascii")
+        except IOError as e:
+            return {"error": f"Error reading image: {e}"}
 
         # Return as image content block for Bedrock
         # This will be handled specially by the agent loop
-        return {
+        result = {
             "__image__": True,
             "type": "image",
             "source": {"type": "base64", "media_type": media_type, "data": data},
             "description": f"Image loaded from {path}",
         }
+        with _cache_lock:
+            _cache[key] = result
+            if len(_cache) > IMAGE_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    # Copies, so callers can't change the cached entry
+    return dict(result, source=dict(result["source"]))
+
 
+def _describe_image(args: dict, ctx) -> str:
+    """Tool entry point: validate the image and report it, without encoding it."""
+    checked = _check_image(args, ctx)
+    if isinstance(checked, dict):
+        return _format_image_result(checked)
+    path = checked[0]
+    try:
+        # Still surface unreadable files, as loading would
+        with open(path, "rb"):
+            pass
     except IOError as e:
-        return {"error": f"Error reading image: {e}"}
+        return _format_image_result({"error": f"Error reading image: {e}"})
+    return _format_image_result({"__image__": True, "description": f"Image loaded from {path}"})
 
 
 def _format_image_result(result: dict) -> str:
@@ -74,31 +133,39 @@ def _format_image_result(result: dict) -> str:
     return str(result)
 
 
+# Tool parameter schema, built once
+_VIEW_IMAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "file_path": {
+            "type": "string",
+            "description": "Path to image file",
+        }
+    },
+    "required": ["file_path"],
+}
+
+
 # Tool definition
 def get_tool():
     """Get vision tool."""
-    Tool = _get_tool_class()
+    from core.tools import Tool
 
     return Tool(
         name="view_image",
         description="View an image file (PNG, JPG, GIF, WebP) for AI analysis. Returns image data that Claude can analyze.",
-        parameters={
-            "type": "object",
-            "properties": {
-                "file_path": {
-                    "type": "string",
-                    "description": "Path to image file",
-                }
-            },
-            "required": ["file_path"],
-        },
-        execute=lambda args, ctx: _format_image_result(view_image(args, ctx)),
+        parameters=_VIEW_IMAGE_SCHEMA,
+        execute=_describe_image,
         requires_approval=False,
     )
 
 
-# Export tool
-VIEW_IMAGE = get_tool()
+# Export tool, built on first access (PEP 562)
+def __getattr__(name):
+    if name == "VIEW_IMAGE":
+        tool = globals()["VIEW_IMAGE"] = get_tool()
+        return tool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Also export the raw image loader for special handling